@@ -1,9 +1,12 @@
 """Telegram bot command handlers"""
 
+import asyncio
+import heapq
 import logging
+import time
 import io
-from typing import Dict, Any
 from datetime import datetime
+from typing import Dict, Any, List, Optional
 
 from telegram import (
     Bot,
@@ -15,20 +18,23 @@ from telegram import (
 )
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
 
-from wordcloud import WordCloud
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-
 from crawler.favorites import FavoritesCrawler
-from .notifier import TelegramNotifier
+from .notifier import TelegramNotifier, notification_locale
 from utils.i18n import I18n
 
 
 class BotHandlers:
     """Telegram bot command handlers"""
 
+    # Maximum number of tags rendered in the word cloud
+    WORDCLOUD_MAX_TAGS = 200
+
+    # Feedback callback action -> (rating, marked button label key)
+    _FEEDBACK_ACTIONS = {
+        "like": (1, "buttons.marked_liked"),
+        "dislike": (-1, "buttons.marked_disliked"),
+    }
+
     def __init__(
         self,
         database,
@@ -37,6 +43,7 @@ class BotHandlers:
         bot: Bot,
         crawler_config: Dict[str, Any],
         telegram_config: Dict[str, Any],
+        favorites_crawler: Optional[FavoritesCrawler] = None,
     ):
         """
         Initialize handlers
@@ -47,6 +54,7 @@ class BotHandlers:
             recommender: Recommendation engine
             crawler_config: Crawler configuration
             telegram_config: Telegram configuration
+            favorites_crawler: Shared favorites crawler (optional)
         """
         self.database = database
         self.ehdb_database = ehdb_database
@@ -62,14 +70,83 @@ class BotHandlers:
                 "No chat_id configured, bot will accept commands from anyone!"
             )
 
-        # Notifier (will be initialized with i18n later)
+        # Notifier (locale is set per request via notification_locale)
         self.notifier = TelegramNotifier(
-            bot, telegram_config["chat_id"], crawler_config.get("host", "e-hentai.org")
+            bot,
+            telegram_config["chat_id"],
+            crawler_config.get("host", "e-hentai.org"),
+            database,
+        )
+
+        # Favorites crawler (reuse shared instance to keep HTTP connections warm)
+        self.favorites_crawler = favorites_crawler or FavoritesCrawler(crawler_config)
+
+        # I18n instances cached per locale
+        self._i18n_cache: Dict[str, I18n] = {}
+
+        # User locale preferences cached in memory (changed only via /language)
+        self._locale_cache: Dict[int, str] = {}
+
+        # Command menus cached per locale
+        self._commands_cache: Dict[str, List[BotCommand]] = {}
+
+        # Rendered /start help text cached per locale
+        self._help_text_cache: Dict[str, str] = {}
+
+        # Available languages scanned once from locales directory
+        self._available_languages = I18n.get_available_locales()
+        self._language_list_text = "\n".join(
+            f"  • {code}: {name}"
+            for code, name in sorted(self._available_languages.items())
         )
-        self.notifier.i18n = None  # Will be set per request
+        self._language_codes_text = ", ".join(sorted(self._available_languages))
+
+        # Feedback writes running in the background (keyed by gid to drop duplicates)
+        self._pending_feedback: Dict[int, asyncio.Task] = {}
+
+    def _i18n(self, locale: str) -> I18n:
+        """
+        Get cached i18n instance for locale
+
+        Args:
+            locale: Language code
+
+        Returns:
+            I18n instance
+        """
+        i18n = self._i18n_cache.get(locale)
+        if i18n is None:
+            i18n = I18n(locale)
+            self._i18n_cache[locale] = i18n
+        return i18n
+
+    def _get_user_locale(self, user_id: int) -> Optional[str]:
+        """
+        Get user language preference (cached)
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            Language code, None if not set
+        """
+        locale = self._locale_cache.get(user_id)
+        if locale is None:
+            locale = self.database.get_user_locale(user_id)
+            if locale:
+                self._locale_cache[user_id] = locale
+        return locale
+
+    def _set_user_locale(self, user_id: int, locale: str) -> None:
+        """
+        Set user language preference and update cache
 
-        # Favorites crawler
-        self.favorites_crawler = FavoritesCrawler(crawler_config)
+        Args:
+            user_id: Telegram user ID
+            locale: Language code
+        """
+        self.database.set_user_locale(user_id, locale)
+        self._locale_cache[user_id] = locale
 
     def _check_access(self, update: Update) -> bool:
         """
@@ -81,15 +158,16 @@ class BotHandlers:
         Returns:
             True if authorized, False otherwise
         """
-        if not self.allowed_user_id:
+        allowed_user_id = self.allowed_user_id
+        if not allowed_user_id:
             # If no chat_id configured, allow all (backward compatibility)
             return True
 
-        if not update.message or not update.message.from_user:
+        message = update.message
+        if message is None:
             return False
-
-        user_id = update.message.from_user.id
-        return user_id == self.allowed_user_id
+        user = message.from_user
+        return user is not None and user.id == allowed_user_id
 
     def _get_i18n(self, update: Update) -> I18n:
         """
@@ -104,28 +182,28 @@ class BotHandlers:
         """
         # For single-user setup, use the configured chat_id's locale
         if self.allowed_user_id:
-            locale = self.database.get_user_locale(self.allowed_user_id)
+            locale = self._get_user_locale(self.allowed_user_id)
             if not locale:
                 # Try to detect from update if available
                 if update.message and update.message.from_user:
                     locale = I18n.get_user_locale(update)
                     # Save to database
-                    self.database.set_user_locale(self.allowed_user_id, locale)
+                    self._set_user_locale(self.allowed_user_id, locale)
                 else:
                     locale = "en"  # Default fallback
-            return I18n(locale)
+            return self._i18n(locale)
 
         # Fallback for multi-user (shouldn't happen in single-user setup)
         if not update.message or not update.message.from_user:
-            return I18n("en")
+            return self._i18n("en")
 
         user_id = update.message.from_user.id
-        locale = self.database.get_user_locale(user_id)
+        locale = self._get_user_locale(user_id)
         if not locale:
             locale = I18n.get_user_locale(update)
-            self.database.set_user_locale(user_id, locale)
+            self._set_user_locale(user_id, locale)
 
-        return I18n(locale)
+        return self._i18n(locale)
 
     async def _require_access(self, update: Update) -> bool:
         """
@@ -138,24 +216,42 @@ class BotHandlers:
             True if authorized, False otherwise
         """
         if not self._check_access(update):
-            if update.message:
-                i18n = I18n("en")  # Use English for error message
-                await update.message.reply_text(
+            message = update.message
+            if message:
+                await message.reply_text(
                     "❌ Unauthorized access. This bot is for personal use only."
                 )
             return False
         return True
 
+    async def _send_recommendations(
+        self, recommendations: List[Dict[str, Any]], source: str
+    ) -> int:
+        """
+        Send recommendations grouped into albums
+
+        Args:
+            recommendations: Recommendation list
+            source: Source tag
+
+        Returns:
+            Number of successfully sent
+        """
+        return await self.notifier.send_recommendations_bulk(recommendations, source)
+
     async def cmd_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
 
         i18n = self._get_i18n(update)
 
-        help_text = f"""
+        help_text = self._help_text_cache.get(i18n.locale)
+        if help_text is None:
+            help_text = f"""
 {i18n.t('commands.start.title')}
 
 {i18n.t('commands.start.available_commands')}
@@ -180,7 +276,8 @@ class BotHandlers:
 
 {i18n.t('commands.start.help_footer')}
 """
-        await update.message.reply_text(help_text, parse_mode="HTML")
+            self._help_text_cache[i18n.locale] = help_text
+        await message.reply_text(help_text, parse_mode="HTML")
 
     async def cmd_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
@@ -188,71 +285,74 @@ class BotHandlers:
 
     async def cmd_sync(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /sync command (incremental sync)"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
         i18n = self._get_i18n(update)
-        await update.message.reply_text(i18n.t("commands.sync.starting"))
+        await message.reply_text(i18n.t("commands.sync.starting"))
 
         try:
             # Get known favorites
-            known_gids = {gid for gid, _ in self.database.get_all_favorites()}
+            known_gids = await asyncio.to_thread(self.database.get_all_favorite_gids)
 
             # Incremental crawl
-            new_favorites = self.favorites_crawler.fetch_new_favorites(known_gids)
+            new_favorites = await asyncio.to_thread(
+                self.favorites_crawler.fetch_new_favorites, known_gids
+            )
 
             # Save to database
-            for gid, token, added_time in new_favorites:
-                self.database.add_favorite(gid, token, added_time)
+            await asyncio.to_thread(self.database.add_favorites_bulk, new_favorites)
 
             # Re-initialize recommendation engine
-            self.recommender.initialize()
+            await asyncio.to_thread(self.recommender.initialize)
 
-            await update.message.reply_text(
+            await message.reply_text(
                 i18n.t("commands.sync.completed", count=len(new_favorites))
             )
 
         except Exception as e:
             self.logger.error(f"Incremental sync failed: {e}")
-            await update.message.reply_text(
-                i18n.t("commands.sync.failed", error=str(e))
-            )
+            await message.reply_text(i18n.t("commands.sync.failed", error=str(e)))
 
     async def cmd_fullsync(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /fullsync command (full sync)"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
         i18n = self._get_i18n(update)
-        await update.message.reply_text(i18n.t("commands.fullsync.starting"))
+        await message.reply_text(i18n.t("commands.fullsync.starting"))
 
         try:
-            # Full crawl
-            all_favorites = self.favorites_crawler.fetch_all_favorites()
+            # Full crawl, writing each page to database as it arrives
+            sync_start = datetime.now()
+            count = await asyncio.to_thread(
+                self.database.add_favorites_bulk,
+                self.favorites_crawler.iter_favorites(),
+            )
 
-            # Clear and refill database
-            self.database.clear_favorites()
-            for gid, token, added_time in all_favorites:
-                self.database.add_favorite(gid, token, added_time)
+            # Drop favorites that were not seen in this sync
+            if count:
+                await asyncio.to_thread(
+                    self.database.remove_favorites_synced_before, sync_start
+                )
 
             # Re-initialize recommendation engine
-            self.recommender.initialize()
+            await asyncio.to_thread(self.recommender.initialize)
 
-            await update.message.reply_text(
-                i18n.t("commands.fullsync.completed", count=len(all_favorites))
-            )
+            await message.reply_text(i18n.t("commands.fullsync.completed", count=count))
 
         except Exception as e:
             self.logger.error(f"Full sync failed: {e}")
-            await update.message.reply_text(
-                i18n.t("commands.fullsync.failed", error=str(e))
-            )
+            await message.reply_text(i18n.t("commands.fullsync.failed", error=str(e)))
 
     async def cmd_recommend(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /recommend command"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
@@ -264,172 +364,158 @@ class BotHandlers:
         except ValueError:
             count = 5
 
-        await update.message.reply_text(
-            i18n.t("commands.recommend.generating", count=count)
-        )
+        await message.reply_text(i18n.t("commands.recommend.generating", count=count))
 
         try:
             # Recommend from gallery pool
             multiplier = self.recommender.config.get("pool_sampling_multiplier", 20)
-            recommendations = self.recommender.recommend_from_pool(count * multiplier)
+            recommendations = await asyncio.to_thread(
+                self.recommender.recommend_from_pool, count * multiplier
+            )
 
             if not recommendations:
-                await update.message.reply_text(i18n.t("commands.recommend.no_results"))
+                await message.reply_text(i18n.t("commands.recommend.no_results"))
                 return
 
             # Take top N
             recommendations = recommendations[:count]
 
-            # Set i18n for notifier
-            self.notifier.i18n = i18n
+            # Set notification locale for this request
+            notification_locale.set(i18n.locale)
 
-            # Send recommendations
-            for rec in recommendations:
-                gallery = rec["gallery"]
-                score = rec["score"]
-                details = rec["details"]
-
-                # Save recommendation record
-                self.database.add_recommendation(
-                    gallery["gid"], score, details, notified=True
-                )
+            # Save recommendation records
+            self.database.add_recommendations_bulk(
+                [
+                    (rec["gallery"]["gid"], rec["score"], rec["details"], True)
+                    for rec in recommendations
+                ]
+            )
 
-                # Send
-                await self.notifier.send_recommendation(
-                    gallery, score, details, source="old"
-                )
+            # Send recommendations
+            await self._send_recommendations(recommendations, source="old")
 
-            await update.message.reply_text(
+            await message.reply_text(
                 i18n.t("commands.recommend.sent", count=len(recommendations))
             )
 
         except Exception as e:
             self.logger.error(f"Recommendation failed: {e}")
-            await update.message.reply_text(
-                i18n.t("commands.recommend.failed", error=str(e))
-            )
+            await message.reply_text(i18n.t("commands.recommend.failed", error=str(e)))
 
     async def cmd_new(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /new command (view new gallery recommendations)"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
         i18n = self._get_i18n(update)
-        await update.message.reply_text(i18n.t("commands.new.checking"))
+        await message.reply_text(i18n.t("commands.new.checking"))
 
         try:
+            # Check window ends now; stored as next checkpoint so galleries
+            # posted during this check are picked up next time
+            now_ts = int(time.time())
+
             # Get last checkpoint
             last_check = self.database.get_checkpoint("new_gallery_check")
             if last_check:
                 since_timestamp = int(last_check)
             else:
                 # Default: check last 24 hours
-                since_timestamp = int(datetime.now().timestamp()) - 86400
+                since_timestamp = now_ts - 86400
 
             # Recommend new galleries
-            recommendations = self.recommender.recommend_new_galleries(
-                since_timestamp, limit=200
+            recommendations = await asyncio.to_thread(
+                self.recommender.recommend_new_galleries, since_timestamp, limit=200
             )
 
             if not recommendations:
-                await update.message.reply_text(i18n.t("commands.new.no_results"))
+                await message.reply_text(i18n.t("commands.new.no_results"))
                 return
 
             # Take top 10
             recommendations = recommendations[:10]
 
-            # Set i18n for notifier
-            self.notifier.i18n = i18n
+            # Set notification locale for this request
+            notification_locale.set(i18n.locale)
 
-            # Send recommendations
-            for rec in recommendations:
-                gallery = rec["gallery"]
-                score = rec["score"]
-                details = rec["details"]
-
-                # Save recommendation record
-                self.database.add_recommendation(
-                    gallery["gid"], score, details, notified=True
-                )
+            # Save recommendation records
+            self.database.add_recommendations_bulk(
+                [
+                    (rec["gallery"]["gid"], rec["score"], rec["details"], True)
+                    for rec in recommendations
+                ]
+            )
 
-                # Send
-                await self.notifier.send_recommendation(
-                    gallery, score, details, source="new"
-                )
+            # Send recommendations
+            await self._send_recommendations(recommendations, source="new")
 
             # Update checkpoint
-            self.database.set_checkpoint(
-                "new_gallery_check", str(int(datetime.now().timestamp()))
-            )
+            self.database.set_checkpoint("new_gallery_check", str(now_ts))
 
-            await update.message.reply_text(
+            await message.reply_text(
                 i18n.t("commands.new.sent", count=len(recommendations))
             )
 
         except Exception as e:
             self.logger.error(f"New gallery recommendation failed: {e}")
-            await update.message.reply_text(i18n.t("commands.new.failed", error=str(e)))
+            await message.reply_text(i18n.t("commands.new.failed", error=str(e)))
 
     async def cmd_related(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /related command"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
         i18n = self._get_i18n(update)
         if not context.args:
-            await update.message.reply_text(i18n.t("commands.related.no_gid"))
+            await message.reply_text(i18n.t("commands.related.no_gid"))
             return
 
         try:
             gid = int(context.args[0])
         except ValueError:
-            await update.message.reply_text(i18n.t("commands.related.invalid_gid"))
+            await message.reply_text(i18n.t("commands.related.invalid_gid"))
             return
 
-        await update.message.reply_text(i18n.t("commands.related.finding", gid=gid))
+        await message.reply_text(i18n.t("commands.related.finding", gid=gid))
 
         try:
             # Recommend similar galleries
-            recommendations = self.recommender.recommend_similar(gid, limit=5)
+            recommendations = await asyncio.to_thread(
+                self.recommender.recommend_similar, gid, limit=5
+            )
 
             if not recommendations:
-                await update.message.reply_text(i18n.t("commands.related.no_results"))
+                await message.reply_text(i18n.t("commands.related.no_results"))
                 return
 
-            # Set i18n for notifier
-            self.notifier.i18n = i18n
+            # Set notification locale for this request
+            notification_locale.set(i18n.locale)
 
             # Send recommendations
-            for rec in recommendations:
-                gallery = rec["gallery"]
-                score = rec["score"]
-                details = rec["details"]
-
-                await self.notifier.send_recommendation(
-                    gallery, score, details, source="manual"
-                )
+            await self._send_recommendations(recommendations, source="manual")
 
-            await update.message.reply_text(
+            await message.reply_text(
                 i18n.t("commands.related.sent", count=len(recommendations))
             )
 
         except Exception as e:
             self.logger.error(f"Related recommendation failed: {e}")
-            await update.message.reply_text(
-                i18n.t("commands.related.failed", error=str(e))
-            )
+            await message.reply_text(i18n.t("commands.related.failed", error=str(e)))
 
     async def cmd_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
         i18n = self._get_i18n(update)
         try:
-            stats = self.database.get_stats()
+            stats = await asyncio.to_thread(self.database.get_stats)
 
             # Get top tags
             top_tags = self.recommender.tag_analyzer.get_top_tags(10)
@@ -460,38 +546,64 @@ class BotHandlers:
 
             if top_tags:
                 lines.append("\n" + i18n.t("commands.stats.top_tags"))
-                for tag, weight in top_tags[:5]:
-                    lines.append(
-                        i18n.t("commands.stats.tag_item", tag=tag, weight=weight)
-                    )
+                tag_tpl = i18n.get_raw("commands.stats.tag_item")
+                lines.extend(
+                    tag_tpl.format(tag=tag, weight=weight)
+                    for tag, weight in top_tags[:5]
+                )
 
             if top_uploaders:
                 lines.append("\n" + i18n.t("commands.stats.top_uploaders"))
-                for uploader, weight, count in top_uploaders:
-                    lines.append(
-                        i18n.t(
-                            "commands.stats.uploader_item",
-                            uploader=uploader,
-                            count=count,
-                        )
-                    )
+                uploader_tpl = i18n.get_raw("commands.stats.uploader_item")
+                lines.extend(
+                    uploader_tpl.format(uploader=uploader, count=count)
+                    for uploader, _, count in top_uploaders
+                )
 
-            await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+            await message.reply_text("\n".join(lines), parse_mode="HTML")
 
         except Exception as e:
             self.logger.error(f"Failed to get statistics: {e}")
-            await update.message.reply_text(
-                i18n.t("commands.stats.failed", error=str(e))
-            )
+            await message.reply_text(i18n.t("commands.stats.failed", error=str(e)))
+
+    @staticmethod
+    def _render_wordcloud(tag_weights: Dict[str, float]) -> io.BytesIO:
+        """
+        Render tag word cloud to PNG
+
+        Args:
+            tag_weights: Tag weight dictionary
+
+        Returns:
+            PNG image byte stream
+        """
+        # Imported lazily: heavy dependency only needed by /wordcloud
+        from wordcloud import WordCloud
+
+        wordcloud = WordCloud(
+            width=800,
+            height=400,
+            background_color="white",
+            colormap="viridis",
+            relative_scaling="auto",
+            min_font_size=10,
+        ).generate_from_frequencies(tag_weights)
+
+        # Save rendered image to byte stream
+        buf = io.BytesIO()
+        wordcloud.to_image().save(buf, format="PNG", optimize=True)
+        buf.seek(0)
+        return buf
 
     async def cmd_wordcloud(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /wordcloud command (generate tag word cloud)"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
         i18n = self._get_i18n(update)
-        await update.message.reply_text(i18n.t("commands.wordcloud.generating"))
+        await message.reply_text(i18n.t("commands.wordcloud.generating"))
 
         try:
             # Get all tag weights
@@ -501,45 +613,32 @@ class BotHandlers:
                 tag_weights = self.recommender.tag_analyzer.user_tag_weights
 
             if not tag_weights:
-                await update.message.reply_text(i18n.t("commands.wordcloud.no_data"))
+                await message.reply_text(i18n.t("commands.wordcloud.no_data"))
                 return
 
-            # Generate word cloud
-            wordcloud = WordCloud(
-                width=800,
-                height=400,
-                background_color="white",
-                colormap="viridis",
-                relative_scaling="auto",
-                min_font_size=10,
-            ).generate_from_frequencies(tag_weights)
-
-            # Plot image
-            plt.figure(figsize=(10, 5))
-            plt.imshow(wordcloud, interpolation="bilinear")
-            plt.axis("off")
-            plt.tight_layout(pad=0)
-
-            # Save to byte stream
-            buf = io.BytesIO()
-            plt.savefig(buf, format="png", dpi=150)
-            buf.seek(0)
-            plt.close()
+            # Keep only top tags, low-weight tags are not visible anyway
+            tag_weights = dict(
+                heapq.nlargest(
+                    self.WORDCLOUD_MAX_TAGS, tag_weights.items(), key=lambda x: x[1]
+                )
+            )
+
+            # Generate word cloud (CPU-bound, off the event loop)
+            buf = await asyncio.to_thread(self._render_wordcloud, tag_weights)
 
             # Send image
-            await update.message.reply_photo(
+            await message.reply_photo(
                 photo=buf, caption=i18n.t("commands.wordcloud.caption")
             )
 
         except Exception as e:
             self.logger.error(f"Word cloud generation failed: {e}")
-            await update.message.reply_text(
-                i18n.t("commands.wordcloud.failed", error=str(e))
-            )
+            await message.reply_text(i18n.t("commands.wordcloud.failed", error=str(e)))
 
     async def cmd_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /settings command"""
-        if not update.message:
+        message = update.message
+        if not message:
             return
         if not await self._require_access(update):
             return
@@ -594,7 +693,93 @@ class BotHandlers:
             )
         )
 
-        await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+        await message.reply_text("\n".join(lines), parse_mode="HTML")
+
+    def _submit_feedback(
+        self, gid: int, rating: int, source: str, message: Message, i18n: I18n
+    ) -> None:
+        """
+        Handle feedback in a background thread so the UI update is not delayed
+
+        Args:
+            gid: Gallery ID
+            rating: Rating (1 or -1)
+            source: Source
+            message: Message the feedback button belongs to (failures are replied to it)
+            i18n: I18n instance for the failure reply
+        """
+        if gid in self._pending_feedback:
+            # Duplicate click while previous feedback is still being processed
+            return
+
+        self._pending_feedback[gid] = asyncio.create_task(
+            self._process_feedback(gid, rating, source, message, i18n)
+        )
+
+    async def _process_feedback(
+        self, gid: int, rating: int, source: str, message: Message, i18n: I18n
+    ) -> None:
+        """Run feedback handling in a worker thread, replying if it fails"""
+        try:
+            await asyncio.to_thread(
+                self.recommender.handle_feedback, gid, rating, source
+            )
+        except Exception as e:
+            # The keyboard already shows the feedback as marked
+            self.logger.error(f"Feedback handling failed: {e}")
+            try:
+                await message.reply_text(
+                    i18n.t("feedback.operation_failed", error=str(e))
+                )
+            except Exception as reply_error:
+                self.logger.error(
+                    f"Failed to send feedback failure reply: {reply_error}"
+                )
+        finally:
+            self._pending_feedback.pop(gid, None)
+
+    @staticmethod
+    def _mark_feedback_keyboard(
+        markup: Optional[InlineKeyboardMarkup], gid: int, label: str
+    ) -> InlineKeyboardMarkup:
+        """
+        Replace feedback buttons of a gallery with a "marked" button
+
+        Single-gallery keyboards are replaced entirely; album keyboards only
+        have the row of the given gallery replaced.
+
+        Args:
+            markup: Current message keyboard
+            gid: Gallery ID that received feedback
+            label: Marked button label
+
+        Returns:
+            New InlineKeyboardMarkup
+        """
+
+        def button_gid(button: InlineKeyboardButton) -> Optional[str]:
+            # callback_data format: action_gid[_source]
+            rest = str(button.callback_data).partition("_")[2]
+            return rest.partition("_")[0] or None
+
+        target = str(gid)
+        rows = markup.inline_keyboard if markup else ()
+        gids = {button_gid(button) for row in rows for button in row}
+        if not gids or gids == {target}:
+            return InlineKeyboardMarkup(
+                [[InlineKeyboardButton(label, callback_data="noop")]]
+            )
+
+        return InlineKeyboardMarkup(
+            [
+                (
+                    [InlineKeyboardButton(f"{index}. {label}", callback_data="noop")]
+                    if any(button_gid(button) == target for button in row)
+                    else list(row)
+                )
+                for index, row in enumerate(rows, 1)
+            ]
+        )
 
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callback"""
@@ -613,69 +798,48 @@ class BotHandlers:
         # Get i18n for callback
         if self.allowed_user_id:
             # For single-user setup, use configured user's locale
-            locale = self.database.get_user_locale(self.allowed_user_id) or "en"
-            i18n = I18n(locale)
+            locale = self._get_user_locale(self.allowed_user_id) or "en"
+            i18n = self._i18n(locale)
         elif query.from_user:
             user_id = query.from_user.id
-            locale = self.database.get_user_locale(user_id) or "en"
-            i18n = I18n(locale)
+            locale = self._get_user_locale(user_id) or "en"
+            i18n = self._i18n(locale)
         else:
-            i18n = I18n("en")
+            i18n = self._i18n("en")
 
         try:
             callback_data = query.data
             if not callback_data:
                 return
-            parts = callback_data.split("_")
-            action = parts[0]
-            gid = int(parts[1])
-            source = parts[2] if len(parts) > 2 else "unknown"
-
-            if action == "like":
-                # Positive feedback
-                self.recommender.handle_feedback(gid, 1, source)
-                await query.edit_message_reply_markup(
-                    reply_markup=InlineKeyboardMarkup(
-                        [
-                            [
-                                InlineKeyboardButton(
-                                    i18n.t("buttons.marked_liked"), callback_data="noop"
-                                )
-                            ]
-                        ]
-                    )
-                )
-
-            elif action == "dislike":
-                # Negative feedback
-                self.recommender.handle_feedback(gid, -1, source)
+            action, _, rest = callback_data.partition("_")
+            if not rest:
+                # Buttons without payload (e.g. "noop")
+                return
+            gid_str, _, source = rest.partition("_")
+            gid = int(gid_str)
+            source = source or "unknown"
+
+            feedback_action = self._FEEDBACK_ACTIONS.get(action)
+            if feedback_action is not None:
+                # Positive/negative feedback
+                rating, label_key = feedback_action
+                self._submit_feedback(gid, rating, source, query.message, i18n)
                 await query.edit_message_reply_markup(
-                    reply_markup=InlineKeyboardMarkup(
-                        [
-                            [
-                                InlineKeyboardButton(
-                                    i18n.t("buttons.marked_disliked"),
-                                    callback_data="noop",
-                                )
-                            ]
-                        ]
+                    reply_markup=self._mark_feedback_keyboard(
+                        query.message.reply_markup, gid, i18n.t(label_key)
                     )
                 )
 
             elif action == "similar":
                 # View related
-                recommendations = self.recommender.recommend_similar(gid, limit=3)
+                recommendations = await asyncio.to_thread(
+                    self.recommender.recommend_similar, gid, limit=3
+                )
 
                 if recommendations:
-                    # Set i18n for notifier
-                    self.notifier.i18n = i18n
-                    for rec in recommendations:
-                        await self.notifier.send_recommendation(
-                            rec["gallery"],
-                            rec["score"],
-                            rec["details"],
-                            source="manual",
-                        )
+                    # Set notification locale for this request
+                    notification_locale.set(i18n.locale)
+                    await self._send_recommendations(recommendations, source="manual")
                     await query.message.reply_text(
                         i18n.t("feedback.related_sent", count=len(recommendations))
                     )
@@ -692,58 +856,48 @@ class BotHandlers:
 
     async def cmd_language(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /language command"""
-        if not update.message or not update.message.from_user:
+        message = update.message
+        if not message or not message.from_user:
             return
         if not await self._require_access(update):
             return
         i18n = self._get_i18n(update)
         # For single-user setup, always use the configured chat_id
-        user_id = (
-            self.allowed_user_id
-            if self.allowed_user_id
-            else update.message.from_user.id
-        )
+        user_id = self.allowed_user_id if self.allowed_user_id else message.from_user.id
 
-        # Dynamically detect available languages from locales directory
-        available_languages = I18n.get_available_locales()
+        available_languages = self._available_languages
 
         if not context.args:
             # Show current language and available options
-            current_locale = self.database.get_user_locale(user_id) or "en"
+            current_locale = self._get_user_locale(user_id) or "en"
             current_lang = available_languages.get(current_locale, current_locale)
-            lang_list = "\n".join(
-                [
-                    f"  • {code}: {name}"
-                    for code, name in sorted(available_languages.items())
-                ]
-            )
             # Use i18n for usage instructions
             usage_text = (
                 i18n.t("commands.language.current", language=current_lang)
                 + "\n\n"
-                + i18n.t("commands.language.available", list=lang_list)
+                + i18n.t("commands.language.available", list=self._language_list_text)
                 + "\n\n"
                 + "Usage: /language <code>\n"
                 + "Example: /language zh_CN"
             )
-            await update.message.reply_text(usage_text)
+            await message.reply_text(usage_text)
             return
 
         # Change language
         new_locale = context.args[0]
         if new_locale not in available_languages:
-            lang_codes = ", ".join(sorted(available_languages.keys()))
-            await update.message.reply_text(
-                i18n.t("commands.language.invalid", languages=lang_codes)
+            await message.reply_text(
+                i18n.t("commands.language.invalid", languages=self._language_codes_text)
             )
             return
 
         # Save to database
-        self.database.set_user_locale(user_id, new_locale)
+        self._set_user_locale(user_id, new_locale)
+        self._help_text_cache.clear()
 
         # Create new i18n instance to get translated message
-        new_i18n = I18n(new_locale)
-        await update.message.reply_text(
+        new_i18n = self._i18n(new_locale)
+        await message.reply_text(
             new_i18n.t(
                 "commands.language.changed", language=available_languages[new_locale]
             )
@@ -756,8 +910,7 @@ class BotHandlers:
         Args:
             app: Telegram Application instance
         """
-        # Get all available languages
-        available_languages = I18n.get_available_locales()
+        available_languages = self._available_languages
 
         def get_telegram_language_code(locale: str) -> str:
             """
@@ -790,48 +943,56 @@ class BotHandlers:
             return base_lang
 
         def build_commands(locale: str) -> list:
-            """Build command list for a specific locale"""
-            i18n = I18n(locale)
-            return [
-                BotCommand("start", i18n.t("cmd_descriptions.start")),
-                BotCommand("sync", i18n.t("cmd_descriptions.sync")),
-                BotCommand("fullsync", i18n.t("cmd_descriptions.fullsync")),
-                BotCommand("recommend", i18n.t("cmd_descriptions.recommend")),
-                BotCommand("new", i18n.t("cmd_descriptions.new")),
-                BotCommand("related", i18n.t("cmd_descriptions.related")),
-                BotCommand("stats", i18n.t("cmd_descriptions.stats")),
-                BotCommand("wordcloud", i18n.t("cmd_descriptions.wordcloud")),
-                BotCommand("settings", i18n.t("cmd_descriptions.settings")),
-                BotCommand("language", i18n.t("cmd_descriptions.language")),
-                BotCommand("help", i18n.t("cmd_descriptions.help")),
-            ]
-
-        # Set default commands (for users without language preference)
-        try:
-            default_commands = build_commands("en")
-            await app.bot.set_my_commands(default_commands)
-            self.logger.info("Telegram command menu (default) set")
-        except Exception as e:
-            self.logger.error(f"Failed to set default command menu: {e}")
-
-        # Set commands for each available language
-        for locale_code in available_languages.keys():
-            # Skip default (already set above)
-            if locale_code == "en":
-                continue
+            """Build command list for a specific locale (memoized)"""
+            commands = self._commands_cache.get(locale)
+            if commands is None:
+                i18n = self._i18n(locale)
+                commands = [
+                    BotCommand("start", i18n.t("cmd_descriptions.start")),
+                    BotCommand("sync", i18n.t("cmd_descriptions.sync")),
+                    BotCommand("fullsync", i18n.t("cmd_descriptions.fullsync")),
+                    BotCommand("recommend", i18n.t("cmd_descriptions.recommend")),
+                    BotCommand("new", i18n.t("cmd_descriptions.new")),
+                    BotCommand("related", i18n.t("cmd_descriptions.related")),
+                    BotCommand("stats", i18n.t("cmd_descriptions.stats")),
+                    BotCommand("wordcloud", i18n.t("cmd_descriptions.wordcloud")),
+                    BotCommand("settings", i18n.t("cmd_descriptions.settings")),
+                    BotCommand("language", i18n.t("cmd_descriptions.language")),
+                    BotCommand("help", i18n.t("cmd_descriptions.help")),
+                ]
+                self._commands_cache[locale] = commands
+            return commands
+
+        # Default commands (for users without language preference) plus one
+        # menu per additional language, all set concurrently
+        locale_codes = ["en"] + [code for code in available_languages if code != "en"]
+        telegram_langs = [None] + [
+            get_telegram_language_code(code) for code in locale_codes[1:]
+        ]
+        results = await asyncio.gather(
+            *(
+                app.bot.set_my_commands(build_commands(code), language_code=lang)
+                for code, lang in zip(locale_codes, telegram_langs)
+            ),
+            return_exceptions=True,
+        )
 
-            try:
-                # Get Telegram language code
-                telegram_lang = get_telegram_language_code(locale_code)
-                commands = build_commands(locale_code)
-                await app.bot.set_my_commands(commands, language_code=telegram_lang)
+        for locale_code, telegram_lang, result in zip(
+            locale_codes, telegram_langs, results
+        ):
+            if telegram_lang is None:
+                if isinstance(result, BaseException):
+                    self.logger.error(f"Failed to set default command menu: {result}")
+                else:
+                    self.logger.info("Telegram command menu (default) set")
+            elif isinstance(result, BaseException):
+                self.logger.warning(
+                    f"Failed to set command menu for {locale_code}: {result}"
+                )
+            else:
                 self.logger.info(
                     f"Telegram command menu set for language: {locale_code} (telegram: {telegram_lang})"
                 )
-            except Exception as e:
-                self.logger.warning(
-                    f"Failed to set command menu for {locale_code}: {e}"
-                )
 
     def setup_application(self, app: Application) -> None:
         """
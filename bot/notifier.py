@@ -1,18 +1,78 @@
 """Telegram notification module"""
 
-import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from telegram import Bot, InlineKeyboardMarkup, InlineKeyboardButton
-from telegram.error import TelegramError
-
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+from telegram import Bot, InlineKeyboardMarkup, InlineKeyboardButton, InputMediaPhoto
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+
+from models.database import Database
 from utils.i18n import I18n
+from .rate_limiter import AsyncTokenBucket
+
+# Locale of notifications sent from the current context (set by handlers per request)
+notification_locale: ContextVar[str] = ContextVar("notification_locale", default="en")
+
+# Shared translation tables per locale (read-only after loading)
+_i18n_cache: Dict[str, I18n] = {}
+
+
+def _current_i18n() -> I18n:
+    """Get i18n instance for the notification locale of the current context"""
+    locale = notification_locale.get()
+    i18n = _i18n_cache.get(locale)
+    if i18n is None:
+        i18n = _i18n_cache[locale] = I18n(locale)
+    return i18n
+
+
+# Gallery message layout (optional blocks carry their own trailing newline)
+_GALLERY_TEMPLATE = (
+    "📚 <b>{title}</b>\n"
+    "{title_jpn_block}"
+    "\n"
+    "{category_line}\n"
+    "{rating_line}\n"
+    "{pages_line}\n"
+    "{uploader_line}\n"
+    "\n"
+    "{score_line}\n"
+    "{tags_block}"
+    "{matched_block}"
+    "\n"
+    "🔗 https://{host}/g/{gid}/{token}/"
+)
 
 
 class TelegramNotifier:
     """Telegram notifier"""
 
-    def __init__(self, bot: Bot, chat_id: int, host: str = "e-hentai.org"):
+    # Telegram limits
+    MEDIA_GROUP_MAX_SIZE = 10
+    CAPTION_MAX_LENGTH = 1024
+
+    # Rate limits: messages per second (bot-wide / per private chat / per group)
+    GLOBAL_RATE = 30.0
+    CHAT_RATE = 1.0
+    CHAT_BURST = 20
+    GROUP_RATE = 20 / 60
+
+    # Number of send queue workers (concurrent sends in batch mode)
+    SEND_CONCURRENCY = 8
+
+    # Maximum attempts when Telegram answers with retry_after
+    MAX_SEND_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        bot: Bot,
+        chat_id: int,
+        host: str = "e-hentai.org",
+        database: Optional[Database] = None,
+    ):
         """
         Initialize notifier
 
@@ -20,12 +80,30 @@ class TelegramNotifier:
             bot: Bot instance
             chat_id: Target Chat ID
             host: E-Hentai site domain
+            database: Local database for persisting thumbnail file_ids
         """
         self.bot: Any = bot
         self.chat_id = chat_id
         self.host = host
         self.logger = logging.getLogger(__name__)
-        self.i18n: Optional[I18n] = None  # Will be set by handlers per request
+
+        # Rate limiting (token buckets) and global pause on retry_after
+        self._global_bucket = AsyncTokenBucket(self.GLOBAL_RATE, self.GLOBAL_RATE)
+        self._chat_buckets: Dict[int, AsyncTokenBucket] = {}
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+        self._pause_until = 0.0
+
+        # Send queue: (priority, sequence, recommendation, source, locale, result future)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._queue_seq = 0
+        self._workers: List[asyncio.Task] = []
+
+        # Telegram file_ids of already sent thumbnails (gid -> file_id)
+        self.database = database
+        self._thumb_file_ids: Dict[int, str] = (
+            database.get_all_thumb_file_ids() if database else {}
+        )
 
     def format_gallery_message(
         self, gallery: Dict[str, Any], score: float, details: Dict[str, Any]
@@ -41,58 +119,72 @@ class TelegramNotifier:
         Returns:
             Formatted message text
         """
-        # Use i18n if available, fallback to English
-        if self.i18n is None:
-            self.i18n = I18n("en")
-
-        gid = gallery["gid"]
-        token = gallery.get("token", "")
-        title = gallery.get("title", "N/A")
-        title_jpn = gallery.get("title_jpn", "")
-        category = gallery.get("category", "N/A")
-        rating = gallery.get("rating", 0)
-        filecount = gallery.get("filecount", 0)
-        uploader = gallery.get("uploader", "N/A")
-
-        # Build message
-        lines = []
-        lines.append(f"📚 <b>{title}</b>")
-        if title_jpn and title_jpn != title:
-            lines.append(f"   {title_jpn}")
-        lines.append("")
-
-        lines.append(self.i18n.t("gallery.category", category=category))
-        lines.append(self.i18n.t("gallery.rating", rating=rating))
-        lines.append(self.i18n.t("gallery.pages", count=filecount))
-        lines.append(self.i18n.t("gallery.uploader", uploader=uploader))
-        lines.append("")
-
-        # Recommendation reason
-        lines.append(self.i18n.t("gallery.recommendation_score", score=score))
-
-        # Parse all tags from gallery
-        all_tags = gallery.get("tags", [])
-        if isinstance(all_tags, str):
-            try:
-                all_tags = json.loads(all_tags)
-            except:
-                all_tags = []
-
-        # Display all tags
-        if all_tags:
-            tags_str = ", ".join(all_tags)
-            lines.append(self.i18n.t("gallery.all_tags", tags=tags_str))
-
-        # Also show matched tags if available
-        matched_tags = details.get("matched_tags", [])
-        if matched_tags:
-            matched_tags_str = ", ".join(matched_tags[:5])
-            lines.append(self.i18n.t("gallery.matched_tags", tags=matched_tags_str))
-
-        lines.append("")
-        lines.append(f"🔗 https://{self.host}/g/{gid}/{token}/")
-
-        return "\n".join(lines)
+        # Tags are decoded from JSON when the gallery row is loaded
+        all_tags = gallery.get("tags")
+        matched_tags = details.get("matched_tags")
+
+        return self._render_gallery_message(
+            _current_i18n(),
+            self.host,
+            gallery["gid"],
+            gallery.get("token", ""),
+            gallery.get("title", "N/A"),
+            gallery.get("title_jpn", ""),
+            gallery.get("category", "N/A"),
+            gallery.get("rating", 0),
+            gallery.get("filecount", 0),
+            gallery.get("uploader", "N/A"),
+            tuple(all_tags) if isinstance(all_tags, list) else (),
+            tuple(matched_tags[:5]) if matched_tags else (),
+            round(score, 4),
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _render_gallery_message(
+        i18n: I18n,
+        host: str,
+        gid: int,
+        token: str,
+        title: str,
+        title_jpn: str,
+        category: str,
+        rating: float,
+        filecount: int,
+        uploader: str,
+        all_tags: Tuple[str, ...],
+        matched_tags: Tuple[str, ...],
+        score: float,
+    ) -> str:
+        """Build gallery message text (cached per gallery, score and locale)"""
+        title_jpn_block = (
+            f"   {title_jpn}\n" if title_jpn and title_jpn != title else ""
+        )
+        tags_block = (
+            i18n.t("gallery.all_tags", tags=", ".join(all_tags)) + "\n"
+            if all_tags
+            else ""
+        )
+        matched_block = (
+            i18n.t("gallery.matched_tags", tags=", ".join(matched_tags)) + "\n"
+            if matched_tags
+            else ""
+        )
+
+        return _GALLERY_TEMPLATE.format(
+            title=title,
+            title_jpn_block=title_jpn_block,
+            category_line=i18n.t("gallery.category", category=category),
+            rating_line=i18n.t("gallery.rating", rating=rating),
+            pages_line=i18n.t("gallery.pages", count=filecount),
+            uploader_line=i18n.t("gallery.uploader", uploader=uploader),
+            score_line=i18n.t("gallery.recommendation_score", score=score),
+            tags_block=tags_block,
+            matched_block=matched_block,
+            host=host,
+            gid=gid,
+            token=token,
+        )
 
     def create_feedback_keyboard(
         self, gid: int, source: str = "new"
@@ -107,109 +199,378 @@ class TelegramNotifier:
         Returns:
             InlineKeyboardMarkup
         """
-        # Use i18n if available, fallback to English
-        if self.i18n is None:
-            self.i18n = I18n("en")
+        return InlineKeyboardMarkup(
+            [
+                [
+                    InlineKeyboardButton(label, callback_data=callback_data % gid)
+                    for label, callback_data in row
+                ]
+                for row in self._feedback_keyboard_template(_current_i18n(), source)
+            ]
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _feedback_keyboard_template(
+        i18n: I18n, source: str
+    ) -> Tuple[Tuple[Tuple[str, str], ...], ...]:
+        """Button labels and callback data patterns (gid as %d) per locale and source"""
+        return (
+            (
+                (i18n.t("buttons.like"), f"like_%d_{source}"),
+                (i18n.t("buttons.dislike"), f"dislike_%d_{source}"),
+            ),
+            ((i18n.t("buttons.view_related"), "similar_%d"),),
+        )
+
+    def create_album_feedback_keyboard(
+        self, gids: List[int], source: str = "new"
+    ) -> InlineKeyboardMarkup:
+        """
+        Create feedback keyboard for an album (one row per gallery)
+
+        Args:
+            gids: Gallery IDs in album order
+            source: Source tag
+
+        Returns:
+            InlineKeyboardMarkup
+        """
+        i18n = _current_i18n()
+        like = i18n.t("buttons.like")
+        dislike = i18n.t("buttons.dislike")
+        view_related = i18n.t("buttons.view_related")
 
         keyboard = [
             [
                 InlineKeyboardButton(
-                    self.i18n.t("buttons.like"), callback_data=f"like_{gid}_{source}"
+                    f"{i}. {like}", callback_data=f"like_{gid}_{source}"
                 ),
                 InlineKeyboardButton(
-                    self.i18n.t("buttons.dislike"),
-                    callback_data=f"dislike_{gid}_{source}",
+                    f"{i}. {dislike}", callback_data=f"dislike_{gid}_{source}"
                 ),
-            ],
-            [
                 InlineKeyboardButton(
-                    self.i18n.t("buttons.view_related"), callback_data=f"similar_{gid}"
-                )
-            ],
+                    f"{i}. {view_related}", callback_data=f"similar_{gid}"
+                ),
+            ]
+            for i, gid in enumerate(gids, 1)
         ]
         return InlineKeyboardMarkup(keyboard)
 
-    async def send_recommendation(
+    def _chat_bucket(self, chat_id: int) -> AsyncTokenBucket:
+        """Get token bucket for a chat (groups have negative IDs)"""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if chat_id < 0:
+                bucket = AsyncTokenBucket(self.GROUP_RATE, self.CHAT_BURST)
+            else:
+                bucket = AsyncTokenBucket(self.CHAT_RATE, self.CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def _throttle(self, messages: int = 1) -> None:
+        """
+        Wait until sending is allowed by pause state and rate limits
+
+        Args:
+            messages: Number of messages about to be sent
+        """
+        await self._resume_event.wait()
+        await self._global_bucket.acquire(messages)
+        await self._chat_bucket(self.chat_id).acquire(messages)
+
+    async def _pause(self, seconds: float) -> None:
+        """
+        Pause all senders after Telegram answered with retry_after
+
+        Args:
+            seconds: Pause duration
+        """
+        self._pause_until = max(self._pause_until, time.monotonic() + seconds)
+        self._resume_event.clear()
+        self.logger.warning(f"Telegram rate limit hit, pausing sends for {seconds}s")
+        while (remaining := self._pause_until - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+        self._resume_event.set()
+
+    async def _remember_thumb(self, gid: int, message: Any) -> None:
+        """Store file_id of a sent photo so later sends skip the URL fetch"""
+        if not message or not message.photo:
+            return
+        file_id = message.photo[-1].file_id
+        if self._thumb_file_ids.get(gid) == file_id:
+            return
+        self._thumb_file_ids[gid] = file_id
+        if self.database:
+            try:
+                await asyncio.to_thread(self.database.set_thumb_file_id, gid, file_id)
+            except Exception as e:
+                self.logger.warning(f"Failed to save thumbnail file_id: {e}")
+
+    async def _forget_thumb(self, gid: int) -> None:
+        """Drop a file_id Telegram no longer accepts"""
+        if self._thumb_file_ids.pop(gid, None) and self.database:
+            try:
+                await asyncio.to_thread(self.database.delete_thumb_file_id, gid)
+            except Exception as e:
+                self.logger.warning(f"Failed to delete thumbnail file_id: {e}")
+
+    async def _send_photo(
+        self, gid: int, thumb: str, caption: str, keyboard: InlineKeyboardMarkup
+    ) -> None:
+        """
+        Send photo, reusing cached file_id when available
+
+        Raises:
+            TelegramError: Sending by URL failed
+        """
+        file_id = self._thumb_file_ids.get(gid)
+        if file_id:
+            try:
+                await self._throttle()
+                await self.bot.send_photo(
+                    chat_id=self.chat_id,
+                    photo=file_id,
+                    caption=caption,
+                    parse_mode="HTML",
+                    reply_markup=keyboard,
+                )
+                return
+            except BadRequest as e:
+                self.logger.warning(f"Cached thumbnail rejected: {e}, using URL")
+                await self._forget_thumb(gid)
+
+        await self._throttle()
+        message = await self.bot.send_photo(
+            chat_id=self.chat_id,
+            photo=thumb,
+            caption=caption,
+            parse_mode="HTML",
+            reply_markup=keyboard,
+        )
+        await self._remember_thumb(gid, message)
+
+    async def _deliver_recommendation(
+        self, gid: int, thumb: str, message: str, keyboard: InlineKeyboardMarkup
+    ) -> None:
+        """
+        Deliver a single recommendation (photo with fallback to text)
+
+        Raises:
+            RetryAfter: Telegram rate limit hit
+        """
+        # Send message (with image)
+        if thumb:
+            try:
+                await self._send_photo(gid, thumb, message, keyboard)
+                return
+            except RetryAfter:
+                raise
+            except TelegramError as e:
+                # Fallback to plain text if image sending fails
+                self.logger.warning(f"Image sending failed: {e}, using plain text")
+
+        # Plain text message
+        await self._throttle()
+        await self.bot.send_message(
+            chat_id=self.chat_id,
+            text=message,
+            parse_mode="HTML",
+            reply_markup=keyboard,
+            disable_web_page_preview=False,
+        )
+
+    def _ensure_workers(self) -> None:
+        """Start send queue workers on first use (requires a running loop)"""
+        self._workers = [task for task in self._workers if not task.done()]
+        for _ in range(self.SEND_CONCURRENCY - len(self._workers)):
+            self._workers.append(asyncio.create_task(self._send_worker()))
+
+    async def _send_worker(self) -> None:
+        """Consume send queue; requeue on retry_after, never retry network errors"""
+        while True:
+            priority, _, rec, source, locale, future = await self._queue.get()
+            # Worker context is private, so the enqueuing request's locale applies
+            notification_locale.set(locale)
+            sent = requeued = False
+            try:
+                await self._resume_event.wait()
+                gallery = rec["gallery"]
+                message = self.format_gallery_message(
+                    gallery, rec["score"], rec["details"]
+                )
+                keyboard = self.create_feedback_keyboard(gallery["gid"], source)
+                await self._deliver_recommendation(
+                    gallery["gid"], gallery.get("thumb", ""), message, keyboard
+                )
+                sent = True
+                self.logger.info(
+                    f"Recommendation sent successfully: gid={gallery['gid']}"
+                )
+            except RetryAfter as e:
+                if priority + 1 < self.MAX_SEND_ATTEMPTS:
+                    self._enqueue(rec, source, future, priority + 1)
+                    requeued = True
+                else:
+                    self.logger.error(f"Failed to send recommendation: {e}")
+                await self._pause(float(e.retry_after))
+            except NetworkError as e:
+                # Request may have reached Telegram; retrying could duplicate it
+                self.logger.error(f"Failed to send recommendation: {e}")
+            except Exception as e:
+                self.logger.error(f"Failed to send recommendation: {e}")
+            finally:
+                if not requeued and not future.done():
+                    future.set_result(sent)
+                self._queue.task_done()
+
+    def _enqueue(
         self,
-        gallery: Dict[str, Any],
-        score: float,
-        details: Dict[str, Any],
-        source: str = "new",
-    ) -> bool:
+        rec: Dict[str, Any],
+        source: str,
+        future: asyncio.Future,
+        priority: int = 0,
+    ) -> None:
+        """Put recommendation into send queue (sequence keeps FIFO per priority)"""
+        self._queue_seq += 1
+        self._queue.put_nowait(
+            (
+                priority,
+                self._queue_seq,
+                rec,
+                source,
+                notification_locale.get(),
+                future,
+            )
+        )
+
+    async def _send_queued(
+        self, recommendations: List[Dict[str, Any]], source: str
+    ) -> int:
         """
-        Send recommendation notification
+        Send recommendations one by one through the send queue workers
 
         Args:
-            gallery: Gallery information
-            score: Recommendation score
-            details: Detailed scores
+            recommendations: Recommendation list
             source: Source tag
 
         Returns:
-            Whether sending was successful
+            Number of successfully sent
         """
-        try:
-            gid = gallery["gid"]
-            thumb = gallery.get("thumb", "")
-
-            # Format message
-            message = self.format_gallery_message(gallery, score, details)
-            keyboard = self.create_feedback_keyboard(gid, source)
-
-            # Send message (with image)
-            if thumb:
-                try:
-                    await self.bot.send_photo(
-                        chat_id=self.chat_id,
-                        photo=thumb,
-                        caption=message,
-                        parse_mode="HTML",
-                        reply_markup=keyboard,
-                    )
-                    self.logger.info(f"Recommendation sent successfully: gid={gid}")
-                    return True
-                except TelegramError as e:
-                    # Fallback to plain text if image sending fails
-                    self.logger.warning(f"Image sending failed: {e}, using plain text")
-
-            # Plain text message
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode="HTML",
-                reply_markup=keyboard,
-                disable_web_page_preview=False,
-            )
+        if not recommendations:
+            return 0
 
-            self.logger.info(f"Recommendation sent successfully: gid={gid}")
-            return True
+        self._ensure_workers()
 
-        except Exception as e:
-            self.logger.error(f"Failed to send recommendation: {e}")
-            return False
+        loop = asyncio.get_running_loop()
+        futures = []
+        for rec in recommendations:
+            future = loop.create_future()
+            self._enqueue(rec, source, future)
+            futures.append(future)
+
+        results = await asyncio.gather(*futures)
+        return sum(1 for result in results if result)
 
-    async def send_batch_recommendations(
-        self, recommendations: List[Dict[str, Any]]
+    async def send_recommendations(
+        self, recommendations: List[Dict[str, Any]], source: str = "new"
     ) -> int:
         """
-        Send recommendations in batch
+        Send recommendations as individual messages, concurrently through the
+        send queue workers (rate limits and retry_after still apply)
 
         Args:
             recommendations: Recommendation list
+            source: Source tag
 
         Returns:
             Number of successfully sent
         """
-        success_count = 0
+        return await self._send_queued(recommendations, source)
+
+    async def send_recommendations_bulk(
+        self, recommendations: List[Dict[str, Any]], source: str = "new"
+    ) -> int:
+        """
+        Send recommendations grouped into photo albums (one API call per album)
+
+        Media groups cannot carry inline keyboards, so each album is followed by
+        a single message holding the feedback buttons for all its galleries.
+        Galleries without thumbnail or with too long captions are sent one by one.
+
+        Args:
+            recommendations: Recommendation list
+            source: Source tag
+
+        Returns:
+            Number of successfully sent
+        """
+        album: List[Dict[str, Any]] = []
+        singles: List[Dict[str, Any]] = []
 
         for rec in recommendations:
-            gallery = rec["gallery"]
-            score = rec["score"]
-            details = rec["details"]
-            source = rec.get("source", "batch")
+            thumb = rec["gallery"].get("thumb", "")
+            message = self.format_gallery_message(
+                rec["gallery"], rec["score"], rec["details"]
+            )
+            if thumb and len(message) <= self.CAPTION_MAX_LENGTH:
+                album.append({"rec": rec, "thumb": thumb, "message": message})
+            else:
+                singles.append(rec)
+
+        success_count = 0
+
+        for start in range(0, len(album), self.MEDIA_GROUP_MAX_SIZE):
+            chunk = album[start : start + self.MEDIA_GROUP_MAX_SIZE]
+            if len(chunk) < 2:
+                # Media group requires at least 2 items
+                singles.extend(item["rec"] for item in chunk)
+                continue
+
+            try:
+                await self._throttle(len(chunk))
+                sent = await self.bot.send_media_group(
+                    chat_id=self.chat_id,
+                    media=[
+                        InputMediaPhoto(
+                            media=self._thumb_file_ids.get(
+                                item["rec"]["gallery"]["gid"], item["thumb"]
+                            ),
+                            caption=item["message"],
+                            parse_mode="HTML",
+                        )
+                        for item in chunk
+                    ],
+                )
+            except RetryAfter as e:
+                # Wait for rate limit to pass, then send one by one
+                await self._pause(float(e.retry_after))
+                singles.extend(item["rec"] for item in chunk)
+                continue
+            except TelegramError as e:
+                # Fallback to individual messages if album sending fails
+                self.logger.warning(f"Album sending failed: {e}, sending one by one")
+                singles.extend(item["rec"] for item in chunk)
+                continue
+
+            gids = [item["rec"]["gallery"]["gid"] for item in chunk]
+            for gid, message in zip(gids, sent):
+                await self._remember_thumb(gid, message)
+            try:
+                await self._throttle()
+                await self.bot.send_message(
+                    chat_id=self.chat_id,
+                    text=_current_i18n().t("gallery.album_feedback", count=len(gids)),
+                    reply_markup=self.create_album_feedback_keyboard(gids, source),
+                    reply_to_message_id=sent[0].message_id,
+                )
+            except TelegramError as e:
+                self.logger.error(f"Failed to send album feedback buttons: {e}")
+
+            success_count += len(chunk)
+            self.logger.info(f"Recommendation album sent successfully: gids={gids}")
 
-            if await self.send_recommendation(gallery, score, details, source):
-                success_count += 1
+        success_count += await self._send_queued(singles, source)
 
         return success_count
 
@@ -224,6 +585,7 @@ class TelegramNotifier:
             Whether successful
         """
         try:
+            await self._throttle()
             await self.bot.send_message(
                 chat_id=self.chat_id, text=text, parse_mode="HTML"
             )
@@ -0,0 +1,45 @@
+"""Async token bucket rate limiter for Telegram API calls"""
+
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """Token bucket shared by coroutines (refills continuously)"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens refilled per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_ts = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add tokens accumulated since last refill"""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._last_ts) * self.rate
+        )
+        self._last_ts = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Wait until the requested tokens are available and take them
+
+        Args:
+            tokens: Number of tokens to take (capped at capacity)
+        """
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
@@ -1,14 +1,38 @@
 """Custom JobQueue, compatible with Application that cannot be weakref'd"""
 
+from typing import Any, Optional
+
 from telegram.ext import JobQueue
 
 
+class _ApplicationRef:
+    """Weakref-like callable holding Application until released"""
+
+    __slots__ = ("_application",)
+
+    def __init__(self, application: Any):
+        self._application: Optional[Any] = application
+
+    def __call__(self) -> Optional[Any]:
+        return self._application
+
+    def release(self) -> None:
+        """Drop the reference so Application can be freed"""
+        self._application = None
+
+
 class SafeJobQueue(JobQueue):
-    """Fallback to strong reference when parent class cannot create weakref to Application"""
+    """Fallback to a releasable reference when parent class cannot create weakref to Application"""
 
     def set_application(self, application):  # type: ignore[override]
         try:
             super().set_application(application)
         except TypeError:
-            self._application = lambda: application  # type: ignore[assignment]
+            self._application = _ApplicationRef(application)  # type: ignore[assignment]
             self.scheduler.configure(**self.scheduler_configuration)
+
+    async def stop(self, wait: bool = True) -> None:
+        await super().stop(wait=wait)
+        # Break the JobQueue <-> Application reference cycle on shutdown
+        if isinstance(self._application, _ApplicationRef):
+            self._application.release()
@@ -1,16 +1,106 @@
 """User favorites crawling module"""
 
+import random
 import re
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from typing import List, Tuple, Dict, Any, Optional, Union
+from urllib.parse import urljoin, urlparse
+from typing import Iterator, List, Tuple, Dict, Any, Optional, Union
 import logging
 
+try:
+    # Optional: C-level HTML parser, regexes are used when unavailable
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Gallery link: /g/GID/TOKEN/
+_LINK_RE = re.compile(r"/g/(\d+)/([0-9a-f]{10})/", re.ASCII)
+
+# Favorite time: <p>Favorited:</p><p>2025-10-11 12:54</p>
+_FAVTIME_RE = re.compile(
+    r"<p>Favorited:</p>\s*<p>([\d\-\s:]+)</p>", re.ASCII | re.IGNORECASE
+)
+
+# Next page link: favorites.php?...next=GID-TIMESTAMP
+_NEXT_RE = re.compile(r'favorites\.php\?[^"\']*next=(\d+-\d+)', re.ASCII)
+
+
+def _parse_page_regex(
+    html: str,
+) -> Tuple[List[Tuple[str, str]], List[str], Optional[str]]:
+    """
+    Parse favorites page with regexes
+
+    Returns:
+        (gallery links [(gid, token), ...], favorite times, next token)
+    """
+    links = _LINK_RE.findall(html)
+    favtimes = _FAVTIME_RE.findall(html)
+    next_match = _NEXT_RE.search(html)
+    return links, favtimes, next_match.group(1) if next_match else None
+
+
+def _parse_page_selectolax(
+    html: str,
+) -> Tuple[List[Tuple[str, str]], List[str], Optional[str]]:
+    """
+    Parse favorites page with selectolax
+
+    Returns:
+        (gallery links [(gid, token), ...], favorite times, next token)
+    """
+    tree = HTMLParser(html)
+
+    links = []
+    for node in tree.css("a[href*='/g/']"):
+        match = _LINK_RE.search(node.attributes.get("href") or "")
+        if match:
+            links.append(match.groups())
+
+    # Format: <p>Favorited:</p><p>2025-10-11 12:54</p>
+    favtimes = []
+    for node in tree.css("p"):
+        if node.text(strip=True) != "Favorited:":
+            continue
+        sibling = node.next
+        while sibling is not None and sibling.tag != "p":
+            sibling = sibling.next
+        if sibling is not None:
+            favtimes.append(sibling.text())
+
+    next_token = None
+    for node in tree.css("a[href*='next=']"):
+        match = _NEXT_RE.search(node.attributes.get("href") or "")
+        if match:
+            next_token = match.group(1)
+            break
+
+    return links, favtimes, next_token
+
+
+_parse_page = _parse_page_selectolax if HTMLParser is not None else _parse_page_regex
+
+
+class CrawlerAuthError(Exception):
+    """Site rejected crawler cookies (redirected away from favorites)"""
+
 
 class FavoritesCrawler:
     """E-Hentai favorites crawler"""
 
+    # Maximum concurrent requests to the site
+    MAX_CONCURRENT_REQUESTS = 4
+
+    # Minimum interval between page requests of one pagination (seconds)
+    PAGE_INTERVAL = 1.0
+
+    # Upper bound for server-requested Retry-After waits (seconds)
+    MAX_RETRY_AFTER = 300.0
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize crawler
@@ -25,8 +115,17 @@ class FavoritesCrawler:
         self.timeout = config.get("timeout", 30)
         self.logger = logging.getLogger(__name__)
 
-        # Setup session
+        # Caps concurrent requests of callers sharing this crawler (bot and scheduler)
+        self._request_semaphore = threading.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        # Setup session (persistent keep-alive connection pool)
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.MAX_CONCURRENT_REQUESTS,
+            pool_maxsize=self.MAX_CONCURRENT_REQUESTS,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -53,34 +152,106 @@ class FavoritesCrawler:
         if self.proxy:
             self.session.proxies = {"http": self.proxy, "https": self.proxy}
 
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        """
+        Get delay before next retry
+
+        Args:
+            attempt: Zero-based attempt number
+            response: Rate-limited response (429/503), if any
+
+        Returns:
+            Server-requested Retry-After, or exponential backoff with jitter
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.MAX_RETRY_AFTER)
+        return 2**attempt + random.uniform(0, 1)
+
+    def _get(self, url: str) -> requests.Response:
+        """
+        GET without automatic redirects, following at most one same-host redirect
+
+        Args:
+            url: Request URL
+
+        Returns:
+            Response
+
+        Raises:
+            CrawlerAuthError: Redirected to another host (cookies rejected)
+        """
+        with self._request_semaphore:
+            response = self.session.get(
+                url, timeout=self.timeout, allow_redirects=False
+            )
+            if response.is_redirect:
+                location = urljoin(url, response.headers.get("Location", ""))
+                redirect_host = urlparse(location).hostname
+                if redirect_host != self.host:
+                    raise CrawlerAuthError(
+                        f"Redirected from {self.host} to {redirect_host}, "
+                        "check crawler cookies"
+                    )
+                response = self.session.get(
+                    location, timeout=self.timeout, allow_redirects=False
+                )
+        return response
+
     def _make_request(self, url: str) -> Optional[str]:
         """
-        Make HTTP request (with retry and 302 following)
+        Make HTTP request (with retry and single 302 following)
 
         Args:
             url: Request URL
 
         Returns:
             Response text
+
+        Raises:
+            CrawlerAuthError: Cookies rejected by the site (not retried)
         """
         for attempt in range(self.retry_times):
+            rate_limited = None
             try:
-                response = self.session.get(
-                    url, timeout=self.timeout, allow_redirects=True
-                )
+                response = self._get(url)
+                if response.status_code in (429, 503):
+                    rate_limited = response
+                    raise requests.HTTPError(
+                        f"{response.status_code} rate limited", response=response
+                    )
                 response.raise_for_status()
                 return response.text
-            except Exception as e:
+            except requests.RequestException as e:
                 self.logger.warning(
                     f"Request failed (attempt {attempt + 1}/{self.retry_times}): {e}"
                 )
                 if attempt < self.retry_times - 1:
-                    time.sleep(1)
+                    time.sleep(self._retry_delay(attempt, rate_limited))
                 else:
                     self.logger.error(f"Request finally failed: {url}")
                     return None
         return None
 
+    def _pace(self, last_start: float) -> float:
+        """
+        Wait until PAGE_INTERVAL has passed since the previous page request
+
+        The interval is measured from request start, so response time counts
+        towards it instead of being added on top of a fixed sleep.
+
+        Args:
+            last_start: Monotonic start time of the previous request (0 for none)
+
+        Returns:
+            Monotonic start time of the next request
+        """
+        wait = last_start + self.PAGE_INTERVAL - time.monotonic()
+        if last_start and wait > 0:
+            time.sleep(wait)
+        return time.monotonic()
+
     def fetch_favorites_page(
         self, favcat: Union[int, str] = "all", next_token: str = ""
     ) -> Dict[str, Any]:
@@ -110,11 +281,16 @@ class FavoritesCrawler:
         if not html:
             return {"items": [], "next_token": None}
 
-        # Extract all gallery links
-        link_pattern = r"/g/(\d+)/([0-9a-f]{10})/"
-        matches = re.findall(link_pattern, html)
+        links, favtimes, next_token_value = _parse_page(html)
+
+        # Deduplicate gallery links (order preserved)
+        unique_links = dict.fromkeys(links)
+        items = [
+            {"gid": int(gid_str), "token": token, "favtime": None}
+            for gid_str, token in unique_links
+        ]
 
-        if not matches:
+        if not items:
             self.logger.warning(
                 "No gallery links found, favcat=%s, next=%s",
                 favcat,
@@ -122,41 +298,21 @@ class FavoritesCrawler:
             )
             return {"items": [], "next_token": None}
 
-        # Deduplicate
-        seen = set()
-        items = []
-        for gid_str, token in matches:
-            gid = int(gid_str)
-            key = f"{gid}_{token}"
-            if key not in seen:
-                seen.add(key)
-                items.append({"gid": gid, "token": token, "favtime": None})
-
-        # Extract favorite time
-        # Format: <div...><p>Favorited:</p><p>2025-10-11 12:54</p></div>
-        favtime_pattern = r"<div[^>]*>[\s\S]*?<p>Favorited:</p>[\s\S]*?<p>([\d\-\s:]+)</p>[\s\S]*?</div>"
-        favtimes = re.findall(favtime_pattern, html, re.IGNORECASE)
-
         # Match favorite time to galleries
+        now = datetime.now()
         for i, item in enumerate(items):
             if i < len(favtimes):
                 favtime_str = favtimes[i].strip()
                 try:
-                    # Parse "2025-10-11 12:54" format
-                    dt = datetime.strptime(favtime_str, "%Y-%m-%d %H:%M")
-                    item["favtime"] = dt
-                except Exception as e:
+                    # Parse "2025-10-11 12:54" format (ISO with space separator)
+                    item["favtime"] = datetime.fromisoformat(favtime_str)
+                except ValueError as e:
                     self.logger.warning(
                         f"Failed to parse favorite time: {favtime_str}, {e}"
                     )
-                    item["favtime"] = datetime.now()
+                    item["favtime"] = now
             else:
-                item["favtime"] = datetime.now()
-
-        # Extract next token
-        # Format: favorites.php?...next=GID-TIMESTAMP
-        next_match = re.search(r'favorites\.php\?[^"\']*next=(\d+-\d+)', html)
-        next_token_value = next_match.group(1) if next_match else None
+                item["favtime"] = now
 
         self.logger.info(
             f"Parsed {len(items)} galleries, next={next_token_value or 'none'}"
@@ -167,27 +323,28 @@ class FavoritesCrawler:
 
         return {"items": result_items, "next_token": next_token_value}
 
-    def fetch_all_favorites(
+    def iter_favorites(
         self, favcat: Union[int, str] = "all", max_pages: int = 50
-    ) -> List[Tuple[int, str, datetime]]:
+    ) -> Iterator[Tuple[int, str, datetime]]:
         """
-        Get all favorites (full sync)
+        Iterate over all favorites page by page (full sync, streaming)
 
         Args:
             favcat: Favorites category (0-9 or 'all')
             max_pages: Maximum pages
 
-        Returns:
-            All favorites list
+        Yields:
+            (gid, token, favtime) as each page is fetched
         """
         self.logger.info(f"Starting full sync of favorites (favcat={favcat})")
 
-        all_galleries = []
+        total = 0
         next_token = ""
         page_num = 0
+        last_start = 0.0
 
         while page_num < max_pages:
-            time.sleep(1)  # Rate limiting
+            last_start = self._pace(last_start)  # Rate limiting
 
             result = self.fetch_favorites_page(favcat, next_token)
 
@@ -195,7 +352,8 @@ class FavoritesCrawler:
                 self.logger.info(f"Page {page_num} has no data, stopping sync")
                 break
 
-            all_galleries.extend(result["items"])
+            total += len(result["items"])
+            yield from result["items"]
 
             if not result["next_token"]:
                 self.logger.info("Reached last page")
@@ -204,8 +362,22 @@ class FavoritesCrawler:
             next_token = result["next_token"]
             page_num += 1
 
-        self.logger.info(f"Full sync completed, total {len(all_galleries)} favorites")
-        return all_galleries
+        self.logger.info(f"Full sync completed, total {total} favorites")
+
+    def fetch_all_favorites(
+        self, favcat: Union[int, str] = "all", max_pages: int = 50
+    ) -> List[Tuple[int, str, datetime]]:
+        """
+        Get all favorites (full sync)
+
+        Args:
+            favcat: Favorites category (0-9 or 'all')
+            max_pages: Maximum pages
+
+        Returns:
+            All favorites list
+        """
+        return list(self.iter_favorites(favcat, max_pages))
 
     def fetch_new_favorites(
         self, known_gids: set, favcat: Union[int, str] = "all", max_pages: int = 10
@@ -228,9 +400,10 @@ class FavoritesCrawler:
         new_galleries = []
         next_token = ""
         page_num = 0
+        last_start = 0.0
 
         while page_num < max_pages:
-            time.sleep(1)  # Rate limiting
+            last_start = self._pace(last_start)  # Rate limiting
 
             result = self.fetch_favorites_page(favcat, next_token)
 
@@ -258,28 +431,3 @@ class FavoritesCrawler:
             f"Incremental sync completed, {len(new_galleries)} new favorites"
         )
         return new_galleries
-
-    def fetch_all_categories(
-        self, max_pages_per_category: int = 50
-    ) -> List[Tuple[int, str, datetime]]:
-        """
-        Get favorites from all 10 favorite categories
-
-        Args:
-            max_pages_per_category: Maximum pages per category
-
-        Returns:
-            All favorites list
-        """
-        self.logger.info("Starting sync of all favorite categories")
-
-        all_galleries = []
-
-        for favcat in range(10):
-            self.logger.info(f"\nSyncing favorite category {favcat}...")
-            galleries = self.fetch_all_favorites(favcat, max_pages_per_category)
-            all_galleries.extend(galleries)
-            self.logger.info(f"Category {favcat} completed, got {len(galleries)} items")
-
-        self.logger.info(f"\nTotal sync: {len(all_galleries)} favorites")
-        return all_galleries
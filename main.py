@@ -3,6 +3,7 @@
 import signal
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from telegram.ext import Application
@@ -13,6 +14,7 @@ from utils.logger import setup_logger
 from models.database import Database
 from models.ehdb import EhdbDatabase
 from recommender.engine import RecommendationEngine
+from crawler.favorites import FavoritesCrawler
 from bot.handlers import BotHandlers
 from bot.safe_job_queue import SafeJobQueue
 from scheduler.tasks import TaskScheduler
@@ -45,16 +47,16 @@ class EhRecommender:
         self.logger.info("Initializing local database...")
         self.database = Database(self.config.local_database)
 
-        self.logger.info("Connecting to EHDB database...")
         self.ehdb_database = EhdbDatabase(self.config.ehdb_database)
-        self.ehdb_database.connect()
-
-        # Initialize recommendation engine
-        self.logger.info("Initializing recommendation engine...")
         self.recommender = RecommendationEngine(
             self.database, self.ehdb_database, self.config.recommender
         )
-        self.recommender.initialize()
+
+        # Connect EHDB and build user profile in background while the
+        # Telegram application, bot handlers and scheduler are set up
+        executor = ThreadPoolExecutor(max_workers=1)
+        engine_future = executor.submit(self._init_recommender)
+        executor.shutdown(wait=False)
 
         # Create Telegram Application with proxy configuration
         self.logger.info("Creating Telegram Application...")
@@ -105,6 +107,9 @@ class EhRecommender:
         # Build Application
         self.application = builder.build()
 
+        # Favorites crawler shared by bot handlers and scheduled tasks
+        self.favorites_crawler = FavoritesCrawler(self.config.crawler)
+
         # Initialize Telegram bot
         self.logger.info("Initializing Telegram bot...")
         self.bot_handlers = BotHandlers(
@@ -114,6 +119,7 @@ class EhRecommender:
             self.application.bot,
             self.config.crawler,
             self.config.telegram,
+            self.favorites_crawler,
         )
 
         # Setup handlers
@@ -129,14 +135,27 @@ class EhRecommender:
             self.config.crawler,
             self.config.telegram,
             self.config.scheduler,
+            self.favorites_crawler,
         )
 
+        # Wait for background initialization (re-raises its errors)
+        engine_future.result()
+
         # Register signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
 
         self.logger.info("Initialization completed")
 
+    def _init_recommender(self) -> None:
+        """Connect EHDB database and initialize recommendation engine"""
+        self.logger.info("Connecting to EHDB database...")
+        self.ehdb_database.connect()
+        self.ehdb_database.check_indexes()
+
+        self.logger.info("Initializing recommendation engine...")
+        self.recommender.initialize()
+
     def _signal_handler(self, signum, frame):
         """Handle termination signals"""
         self.logger.info(f"Received signal {signum}, preparing to exit...")
@@ -152,6 +171,7 @@ class EhRecommender:
 
         # Close database connections
         self.ehdb_database.close()
+        self.database.close()
 
         self.logger.info("System shutdown completed")
 
@@ -0,0 +1,12 @@
+-- Recommended index for the EHDB gallery table.
+--
+-- search_similar_galleries filters with `tags ?| text[]`, which can only use a
+-- GIN index built with the default jsonb_ops operator class (jsonb_path_ops
+-- supports containment operators only). Without it every similarity search is
+-- a sequential scan over the whole table.
+--
+-- Run against the EHDB database by a user with CREATE privileges:
+--   psql -d <dbname> -f migrations/ehdb_gallery_tags_gin.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS gallery_tags_gin
+    ON gallery USING GIN (tags);
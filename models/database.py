@@ -1,9 +1,13 @@
 """SQLite database model"""
 
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Any
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Set, Tuple, Dict, Any
 import json
 import logging
 
@@ -11,6 +15,9 @@ import logging
 class Database:
     """Local SQLite database management class"""
 
+    # Seconds get_stats results are reused
+    STATS_CACHE_TTL = 5.0
+
     def __init__(self, db_path: str):
         """
         Initialize database
@@ -21,106 +28,171 @@ class Database:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger(__name__)
+
+        # One long-lived connection per thread (keeps SQLite page cache warm)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Read caches: stats (timestamp, value) by TTL, tag weights until written
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._tag_preferences_cache: Optional[Mapping[str, float]] = None
+        # Bumped on every tag preference write: a load that raced with a write
+        # (writers run in feedback threads) is not stored in the cache
+        self._tag_preferences_version = 0
+        self._tag_preferences_lock = threading.Lock()
+
         self._init_database()
 
     def get_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        """
+        Get database connection of the current thread
+
+        Using it as a context manager commits or rolls back the transaction
+        but keeps the connection open for reuse.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open new connection (with per-connection tuning PRAGMAs)"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        conn.executescript(
+            """
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA mmap_size=268435456;
+            PRAGMA busy_timeout=5000;
+        """
+        )
         return conn
 
+    def close(self) -> None:
+        """Close all cached connections"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Failed to close database connection: {e}")
+        self._local = threading.local()
+
     def _init_database(self) -> None:
         """Initialize database table structure"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            # WAL lets readers and writers run concurrently (persistent setting)
+            if str(self.db_path) != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL").fetchone()
 
-            # User favorites table
-            cursor.execute(
+            # Whole schema in one script and one transaction
+            conn.executescript(
                 """
+                BEGIN;
+
+                -- User favorites table
                 CREATE TABLE IF NOT EXISTS favorites (
                     gid INTEGER PRIMARY KEY,
                     token TEXT NOT NULL,
-                    added_time TIMESTAMP NOT NULL,
-                    last_sync TIMESTAMP NOT NULL
-                )
-            """
-            )
+                    added_time INTEGER NOT NULL,
+                    last_sync INTEGER NOT NULL
+                );
 
-            # User feedback table
-            cursor.execute(
-                """
+                -- User feedback table
                 CREATE TABLE IF NOT EXISTS feedback (
                     gid INTEGER PRIMARY KEY,
                     rating INTEGER NOT NULL,
-                    feedback_time TIMESTAMP NOT NULL,
+                    feedback_time INTEGER NOT NULL,
                     source TEXT NOT NULL
-                )
-            """
-            )
+                );
 
-            # Recommendation history table
-            cursor.execute(
-                """
+                -- Recommendation history table
                 CREATE TABLE IF NOT EXISTS recommendation_history (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     gid INTEGER NOT NULL,
                     score REAL NOT NULL,
                     reason TEXT NOT NULL,
-                    recommended_time TIMESTAMP NOT NULL,
+                    recommended_time INTEGER NOT NULL,
                     notified INTEGER DEFAULT 0
-                )
-            """
-            )
-            cursor.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_rec_history_gid
-                ON recommendation_history(gid)
-            """
-            )
-            cursor.execute(
-                """
+                );
+                -- Composite index serves both gid lookups and is_recommended's time filter
+                CREATE INDEX IF NOT EXISTS idx_rec_history_gid_time
+                ON recommendation_history(gid, recommended_time DESC);
+                DROP INDEX IF EXISTS idx_rec_history_gid;
                 CREATE INDEX IF NOT EXISTS idx_rec_history_time
-                ON recommendation_history(recommended_time DESC)
-            """
-            )
+                ON recommendation_history(recommended_time DESC);
 
-            # User preferences table
-            cursor.execute(
-                """
+                -- User preferences table
                 CREATE TABLE IF NOT EXISTS user_preferences (
                     tag TEXT PRIMARY KEY,
                     weight REAL NOT NULL DEFAULT 1.0,
                     positive_count INTEGER DEFAULT 0,
                     negative_count INTEGER DEFAULT 0,
-                    updated_time TIMESTAMP NOT NULL
-                )
-            """
-            )
+                    updated_time INTEGER NOT NULL
+                );
 
-            # Sync checkpoint table
-            cursor.execute(
-                """
+                -- Sync checkpoint table
                 CREATE TABLE IF NOT EXISTS sync_checkpoint (
                     key TEXT PRIMARY KEY,
                     value TEXT NOT NULL
-                )
-            """
-            )
+                );
 
-            # User settings table (for language preference, etc.)
-            cursor.execute(
-                """
+                -- User settings table (for language preference, etc.)
                 CREATE TABLE IF NOT EXISTS user_settings (
                     user_id INTEGER PRIMARY KEY,
                     locale TEXT NOT NULL DEFAULT 'en',
-                    updated_time TIMESTAMP NOT NULL
-                )
+                    updated_time INTEGER NOT NULL
+                );
+
+                -- Telegram file_id of sent gallery thumbnails (reused instead of URL)
+                CREATE TABLE IF NOT EXISTS thumb_file_ids (
+                    gid INTEGER PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    updated_time INTEGER NOT NULL
+                );
+
+                COMMIT;
             """
             )
 
-            conn.commit()
+            if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+                self._migrate_timestamps(conn)
+
             self.logger.info("Database initialization completed")
 
+    def _migrate_timestamps(self, conn: sqlite3.Connection) -> None:
+        """Convert TIMESTAMP text written by older versions to Unix epoch seconds"""
+        # Old values are naive local time, 'utc' shifts them to epoch seconds
+        updates = "".join(
+            f"""
+                UPDATE {table} SET {column} = CAST(strftime('%s', {column}, 'utc') AS INTEGER)
+                WHERE typeof({column}) = 'text';"""
+            for table, column in (
+                ("favorites", "added_time"),
+                ("favorites", "last_sync"),
+                ("feedback", "feedback_time"),
+                ("recommendation_history", "recommended_time"),
+                ("user_preferences", "updated_time"),
+                ("user_settings", "updated_time"),
+                ("thumb_file_ids", "updated_time"),
+            )
+        )
+        conn.executescript(
+            f"""
+                BEGIN;
+                {updates}
+                PRAGMA user_version = 1;
+                COMMIT;
+            """
+        )
+
     # ==================== Favorites Management ====================
 
     def add_favorite(self, gid: int, token: str, added_time: datetime) -> None:
@@ -132,37 +204,92 @@ class Database:
                 INSERT OR REPLACE INTO favorites (gid, token, added_time, last_sync)
                 VALUES (?, ?, ?, ?)
             """,
-                (gid, token, added_time, datetime.now()),
+                (gid, token, int(added_time.timestamp()), int(time.time())),
+            )
+
+    def add_favorites_bulk(
+        self, favorites: Iterable[Tuple[int, str, datetime]], batch_size: int = 500
+    ) -> int:
+        """
+        Add favorites in batch (single transaction per batch)
+
+        Args:
+            favorites: Favorites iterable [(gid, token, added_time), ...]; may be
+                a generator, rows are written as they arrive
+            batch_size: Number of rows committed per transaction
+
+        Returns:
+            Number of favorites written
+        """
+        count = 0
+        now = int(time.time())
+        iterator = iter(favorites)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                cursor.executemany(
+                    """
+                    INSERT OR REPLACE INTO favorites (gid, token, added_time, last_sync)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    [
+                        (gid, token, int(added_time.timestamp()), now)
+                        for gid, token, added_time in batch
+                    ],
+                )
+                # Commit per batch so a long crawl does not hold the write lock
+                conn.commit()
+                count += len(batch)
+        return count
+
+    def remove_favorites_synced_before(self, sync_time: datetime) -> int:
+        """
+        Remove favorites not seen by a sync started at sync_time
+
+        Args:
+            sync_time: Start time of the full sync
+
+        Returns:
+            Number of removed favorites
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM favorites WHERE last_sync < ?",
+                (int(sync_time.timestamp()),),
             )
-            conn.commit()
+        return cursor.rowcount
 
     def remove_favorite(self, gid: int) -> None:
         """Remove favorite"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM favorites WHERE gid = ?", (gid,))
-            conn.commit()
 
     def get_all_favorites(self) -> List[Tuple[int, str]]:
         """Get all favorites (gid, token)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # Plain tuples
             cursor.execute("SELECT gid, token FROM favorites")
-            return [(row["gid"], row["token"]) for row in cursor.fetchall()]
+            return cursor.fetchall()
 
-    def is_favorited(self, gid: int) -> bool:
-        """Check if already favorited"""
+    def get_all_favorite_gids(self) -> Set[int]:
+        """Get all favorite gids"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM favorites WHERE gid = ? LIMIT 1", (gid,))
-            return cursor.fetchone() is not None
+            cursor.row_factory = None  # Plain tuples
+            cursor.execute("SELECT gid FROM favorites")
+            return {row[0] for row in cursor}
 
     def clear_favorites(self) -> None:
         """Clear favorites table (for full sync)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM favorites")
-            conn.commit()
 
     # ==================== Feedback Management ====================
 
@@ -182,24 +309,16 @@ class Database:
                 INSERT OR REPLACE INTO feedback (gid, rating, feedback_time, source)
                 VALUES (?, ?, ?, ?)
             """,
-                (gid, rating, datetime.now(), source),
+                (gid, rating, int(time.time()), source),
             )
-            conn.commit()
-
-    def get_feedback(self, gid: int) -> Optional[int]:
-        """Get gallery feedback rating"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT rating FROM feedback WHERE gid = ?", (gid,))
-            row = cursor.fetchone()
-            return row["rating"] if row else None
 
     def get_all_feedback(self) -> List[Tuple[int, int]]:
         """Get all feedback (gid, rating)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # Plain tuples
             cursor.execute("SELECT gid, rating FROM feedback")
-            return [(row["gid"], row["rating"]) for row in cursor.fetchall()]
+            return cursor.fetchall()
 
     # ==================== Recommendation History ====================
 
@@ -219,39 +338,92 @@ class Database:
                     gid,
                     score,
                     json.dumps(reason, ensure_ascii=False),
-                    datetime.now(),
+                    int(time.time()),
                     1 if notified else 0,
                 ),
             )
-            conn.commit()
 
-    def is_recommended(self, gid: int, expiry_days: Optional[int] = None) -> bool:
+    def add_recommendations_bulk(
+        self, recommendations: List[Tuple[int, float, Dict[str, Any], bool]]
+    ) -> None:
         """
-        Check if already recommended
+        Add recommendation records in batch (single transaction)
 
         Args:
-            gid: Gallery ID
-            expiry_days: Expiry days, if specified only check recommendations within this period
+            recommendations: Record list [(gid, score, reason, notified), ...]
+        """
+        if not recommendations:
+            return
+
+        now = int(time.time())
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO recommendation_history
+                (gid, score, reason, recommended_time, notified)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        gid,
+                        score,
+                        json.dumps(reason, ensure_ascii=False),
+                        now,
+                        1 if notified else 0,
+                    )
+                    for gid, score, reason, notified in recommendations
+                ],
+            )
+
+    def get_excluded_gids(
+        self,
+        gids: List[int],
+        expiry_days: Optional[int] = None,
+        include_recommended: bool = True,
+    ) -> Set[int]:
+        """
+        Get which of the given galleries must not be recommended: favorited,
+        feedback given, or (optionally) already recommended
+
+        Args:
+            gids: Candidate gallery ID list
+            expiry_days: Expiry days, if specified only recommendations within this period count
+            include_recommended: Whether already recommended galleries are excluded
 
         Returns:
-            Whether already recommended within validity period
+            Set of excluded gids
         """
+        excluded: Set[int] = set()
+        if not gids:
+            return excluded
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # Plain tuples
+            # Chunk to stay below SQLite's host parameter limit (3 IN lists per query)
+            for start in range(0, len(gids), 300):
+                chunk = gids[start : start + 300]
+                placeholders = ",".join("?" * len(chunk))
+                query = f"""
+                    SELECT gid FROM favorites WHERE gid IN ({placeholders})
+                    UNION
+                    SELECT gid FROM feedback WHERE gid IN ({placeholders})
+                """
+                params: List[Any] = [*chunk, *chunk]
+                if include_recommended:
+                    query += f"""
+                    UNION
+                    SELECT gid FROM recommendation_history WHERE gid IN ({placeholders})
+                    """
+                    params.extend(chunk)
+                    if expiry_days is not None:
+                        query += " AND recommended_time > ?"
+                        params.append(int(time.time()) - expiry_days * 86400)
+                cursor.execute(query, params)
+                excluded.update(row[0] for row in cursor)
 
-            if expiry_days is not None:
-                # Calculate expiry time point
-                expiry_time = datetime.now() - timedelta(days=expiry_days)
-                cursor.execute(
-                    "SELECT 1 FROM recommendation_history WHERE gid = ? AND recommended_time > ? LIMIT 1",
-                    (gid, expiry_time),
-                )
-            else:
-                cursor.execute(
-                    "SELECT 1 FROM recommendation_history WHERE gid = ? LIMIT 1", (gid,)
-                )
-
-            return cursor.fetchone() is not None
+        return excluded
 
     def mark_as_notified(self, gid: int) -> None:
         """Mark as notified"""
@@ -265,7 +437,6 @@ class Database:
             """,
                 (gid,),
             )
-            conn.commit()
 
     def clean_expired_recommendations(self, expiry_days: int) -> int:
         """
@@ -279,7 +450,7 @@ class Database:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            expiry_time = datetime.now() - timedelta(days=expiry_days)
+            expiry_time = int(time.time()) - expiry_days * 86400
             cursor.execute(
                 """
                 DELETE FROM recommendation_history
@@ -288,7 +459,6 @@ class Database:
                 (expiry_time,),
             )
             deleted_count = cursor.rowcount
-            conn.commit()
             return deleted_count
 
     # ==================== User Preferences ====================
@@ -305,9 +475,9 @@ class Database:
                 (tag, weight, positive_count, negative_count, updated_time)
                 VALUES (?, ?, ?, ?, ?)
             """,
-                (tag, weight, positive_count, negative_count, datetime.now()),
+                (tag, weight, positive_count, negative_count, int(time.time())),
             )
-            conn.commit()
+        self._invalidate_tag_preferences()
 
     def get_tag_preference(self, tag: str) -> Optional[Dict[str, Any]]:
         """Get tag preference"""
@@ -331,12 +501,30 @@ class Database:
                 }
             return None
 
-    def get_all_tag_preferences(self) -> Dict[str, float]:
-        """Get all tag weights"""
+    def get_all_tag_preferences(self) -> Mapping[str, float]:
+        """Get all tag weights (cached until preferences are written, read-only)"""
+        tag_preferences = self._tag_preferences_cache
+        if tag_preferences is not None:
+            return tag_preferences
+
+        with self._tag_preferences_lock:
+            version = self._tag_preferences_version
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # Plain tuples
             cursor.execute("SELECT tag, weight FROM user_preferences")
-            return {row["tag"]: row["weight"] for row in cursor.fetchall()}
+            tag_preferences = MappingProxyType(dict(cursor))
+        with self._tag_preferences_lock:
+            # Only cache if no preference was written while loading
+            if version == self._tag_preferences_version:
+                self._tag_preferences_cache = tag_preferences
+        return tag_preferences
+
+    def _invalidate_tag_preferences(self) -> None:
+        """Drop the tag weight cache (call after the write is committed)"""
+        with self._tag_preferences_lock:
+            self._tag_preferences_version += 1
+            self._tag_preferences_cache = None
 
     def get_all_tag_feedback_stats(self) -> Dict[str, Dict[str, int]]:
         """
@@ -367,68 +555,88 @@ class Database:
         if not tag_weights:
             return
 
+        now = int(time.time())
         with self.get_connection() as conn:
             cursor = conn.cursor()
-
-            for tag, base_weight in tag_weights.items():
-                # Check if tag has feedback records
-                cursor.execute(
-                    """
-                    SELECT positive_count, negative_count
-                    FROM user_preferences
-                    WHERE tag = ?
+            # Tags with feedback keep their existing weights (conflict WHERE clause)
+            cursor.executemany(
+                """
+                INSERT INTO user_preferences
+                (tag, weight, positive_count, negative_count, updated_time)
+                VALUES (?, ?, 0, 0, ?)
+                ON CONFLICT(tag) DO UPDATE SET
+                    weight = excluded.weight,
+                    updated_time = excluded.updated_time
+                WHERE positive_count = 0 AND negative_count = 0
                 """,
-                    (tag,),
-                )
-                row = cursor.fetchone()
-
-                if row and (row["positive_count"] > 0 or row["negative_count"] > 0):
-                    # Tags with feedback, preserve existing weights, do not overwrite
-                    continue
+                [(tag, base_weight, now) for tag, base_weight in tag_weights.items()],
+            )
+        self._invalidate_tag_preferences()
 
-                # Tags without feedback, update base weights
-                pos = row["positive_count"] if row else 0
-                neg = row["negative_count"] if row else 0
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO user_preferences
-                    (tag, weight, positive_count, negative_count, updated_time)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (tag, base_weight, pos, neg, datetime.now()),
-                )
+    def increment_tag_feedback(self, tag: str, is_positive: bool) -> Tuple[int, int]:
+        """
+        Increment tag feedback count atomically (safe with concurrent feedback)
 
-            conn.commit()
+        Args:
+            tag: Tag name
+            is_positive: Whether positive feedback
 
-    def increment_tag_feedback(self, tag: str, is_positive: bool) -> None:
-        """Increment tag feedback count"""
+        Returns:
+            (positive count, negative count) after the update
+        """
+        positive, negative = (1, 0) if is_positive else (0, 1)
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            # Get current values first
             cursor.execute(
                 """
-                SELECT weight, positive_count, negative_count
-                FROM user_preferences WHERE tag = ?
+                INSERT INTO user_preferences
+                (tag, weight, positive_count, negative_count, updated_time)
+                VALUES (?, 1.0, ?, ?, ?)
+                ON CONFLICT(tag) DO UPDATE SET
+                    positive_count = positive_count + excluded.positive_count,
+                    negative_count = negative_count + excluded.negative_count,
+                    updated_time = excluded.updated_time
             """,
+                (tag, positive, negative, int(time.time())),
+            )
+            # Read back in the same transaction, the write lock is still held
+            cursor.execute(
+                "SELECT positive_count, negative_count FROM user_preferences WHERE tag = ?",
                 (tag,),
             )
             row = cursor.fetchone()
+        self._invalidate_tag_preferences()
+        return row[0], row[1]
 
-            if row:
-                weight = row["weight"]
-                pos = row["positive_count"]
-                neg = row["negative_count"]
-            else:
-                weight = 1.0
-                pos = neg = 0
+    def add_tag_feedback_counts(self, counts: Dict[str, Tuple[int, int]]) -> None:
+        """
+        Add feedback counts of many tags in one transaction (batch increment_tag_feedback)
 
-            # Update count
-            if is_positive:
-                pos += 1
-            else:
-                neg += 1
+        Args:
+            counts: {tag: (positive count, negative count)}
+        """
+        if not counts:
+            return
 
-            self.update_tag_preference(tag, weight, pos, neg)
+        now = int(time.time())
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO user_preferences
+                (tag, weight, positive_count, negative_count, updated_time)
+                VALUES (?, 1.0, ?, ?, ?)
+                ON CONFLICT(tag) DO UPDATE SET
+                    positive_count = positive_count + excluded.positive_count,
+                    negative_count = negative_count + excluded.negative_count,
+                    updated_time = excluded.updated_time
+            """,
+                [
+                    (tag, positive, negative, now)
+                    for tag, (positive, negative) in counts.items()
+                ],
+            )
+        self._invalidate_tag_preferences()
 
     # ==================== Checkpoint Management ====================
 
@@ -443,7 +651,6 @@ class Database:
             """,
                 (key, value),
             )
-            conn.commit()
 
     def get_checkpoint(self, key: str) -> Optional[str]:
         """Get checkpoint"""
@@ -453,43 +660,66 @@ class Database:
             row = cursor.fetchone()
             return row["value"] if row else None
 
-    # ==================== Statistics ====================
+    # ==================== Thumbnail File IDs ====================
 
-    def get_stats(self) -> Dict[str, Any]:
-        """Get statistics"""
+    def set_thumb_file_id(self, gid: int, file_id: str) -> None:
+        """Set Telegram file_id of gallery thumbnail"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO thumb_file_ids (gid, file_id, updated_time)
+                VALUES (?, ?, ?)
+            """,
+                (gid, file_id, int(time.time())),
+            )
 
-            # Favorites count
-            cursor.execute("SELECT COUNT(*) as count FROM favorites")
-            favorites_count = cursor.fetchone()["count"]
+    def delete_thumb_file_id(self, gid: int) -> None:
+        """Delete Telegram file_id of gallery thumbnail (e.g. when revoked)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM thumb_file_ids WHERE gid = ?", (gid,))
 
-            # Feedback count
-            cursor.execute("SELECT COUNT(*) as count FROM feedback")
-            feedback_count = cursor.fetchone()["count"]
+    def get_all_thumb_file_ids(self) -> Dict[int, str]:
+        """Get Telegram file_ids of all sent gallery thumbnails"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # Plain tuples
+            cursor.execute("SELECT gid, file_id FROM thumb_file_ids")
+            return dict(cursor)
 
-            # Positive/negative feedback
+    # ==================== Statistics ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics (single aggregated query, cached for STATS_CACHE_TTL)"""
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < self.STATS_CACHE_TTL:
+            return dict(cached[1])
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
             cursor.execute(
                 """
                 SELECT
+                    (SELECT COUNT(*) FROM favorites) as favorites_count,
+                    COUNT(*) as feedback_count,
                     SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END) as positive,
-                    SUM(CASE WHEN rating = -1 THEN 1 ELSE 0 END) as negative
+                    SUM(CASE WHEN rating = -1 THEN 1 ELSE 0 END) as negative,
+                    (SELECT COUNT(*) FROM recommendation_history) as recommendation_count
                 FROM feedback
             """
             )
-            feedback_stats = cursor.fetchone()
-
-            # Recommendation count
-            cursor.execute("SELECT COUNT(*) as count FROM recommendation_history")
-            recommendation_count = cursor.fetchone()["count"]
+            row = cursor.fetchone()
 
-            return {
-                "favorites_count": favorites_count,
-                "feedback_count": feedback_count,
-                "positive_feedback": feedback_stats["positive"] or 0,
-                "negative_feedback": feedback_stats["negative"] or 0,
-                "recommendation_count": recommendation_count,
-            }
+        stats = {
+            "favorites_count": row["favorites_count"],
+            "feedback_count": row["feedback_count"],
+            "positive_feedback": row["positive"] or 0,
+            "negative_feedback": row["negative"] or 0,
+            "recommendation_count": row["recommendation_count"],
+        }
+        self._stats_cache = (time.monotonic(), stats)
+        return dict(stats)
 
     # ==================== User Settings ====================
 
@@ -502,9 +732,8 @@ class Database:
                 INSERT OR REPLACE INTO user_settings (user_id, locale, updated_time)
                 VALUES (?, ?, ?)
             """,
-                (user_id, locale, datetime.now()),
+                (user_id, locale, int(time.time())),
             )
-            conn.commit()
 
     def get_user_locale(self, user_id: int) -> Optional[str]:
         """Get user language preference"""
@@ -2,17 +2,46 @@
 
 import json
 import logging
-from decimal import Decimal
-from typing import Any, List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Union
 
-import psycopg
 from psycopg.rows import dict_row
+from psycopg.types.json import set_json_loads
 from psycopg import Connection
+from psycopg_pool import ConnectionPool
+
+try:
+    # Optional: faster JSON decoder for tags, stdlib json is used when unavailable
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Gallery columns, cast in SQL to the Python types used by the recommender
+# (numeric -> float/int, posted -> Unix seconds, tags -> always a decoded
+# list) so rows need no per-value conversion
+_GALLERY_COLUMNS = """gid, token, archiver_key, title, title_jpn, category,
+                   thumb, uploader,
+                   EXTRACT(EPOCH FROM posted)::bigint AS posted,
+                   filecount::bigint AS filecount,
+                   filesize::bigint AS filesize, expunged, removed, replaced,
+                   rating::double precision AS rating,
+                   torrentcount::bigint AS torrentcount,
+                   COALESCE(tags::jsonb, '[]'::jsonb) AS tags"""
 
 
 class EhdbDatabase:
     """EHDB PostgreSQL database connection class (read-only)"""
 
+    # Table sample sizes (percent of blocks) tried by get_random_galleries
+    RANDOM_SAMPLE_PERCENTS = (1.0, 10.0, 100.0)
+    # Rows fetched per round trip by server-side cursors
+    STREAM_ITERSIZE = 500
+    # Connection pool bounds (scoring and search queries run concurrently)
+    POOL_MIN_SIZE = 2
+    POOL_MAX_SIZE = 10
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize database connection
@@ -22,10 +51,10 @@ class EhdbDatabase:
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self._conn: Optional[Connection[Any]] = None
+        self._pool: Optional[ConnectionPool] = None
 
     def connect(self) -> None:
-        """Establish database connection"""
+        """Open connection pool (waits until the minimum connections are up)"""
         try:
             conninfo = (
                 f"host={self.config['host']} "
@@ -34,44 +63,125 @@ class EhdbDatabase:
                 f"password={self.config['password']} "
                 f"dbname={self.config['dbname']}"
             )
-            self._conn = psycopg.connect(conninfo)
+            pool = ConnectionPool(
+                conninfo,
+                min_size=self.POOL_MIN_SIZE,
+                max_size=self.POOL_MAX_SIZE,
+                kwargs={"row_factory": dict_row},
+                configure=self._configure_connection,
+                open=False,
+            )
+            pool.open(wait=True)
+            self._pool = pool
             self.logger.info("EHDB database connection successful")
         except Exception as e:
             self.logger.error(f"EHDB database connection failed: {e}")
             raise
 
+    @staticmethod
+    def _configure_connection(conn: Connection[Any]) -> None:
+        """Set up each new pooled connection"""
+        # Decode json/jsonb columns (tags) once, when rows are fetched
+        set_json_loads(_json_loads, conn)
+        # Prepare repeated queries server-side from their second execution
+        conn.prepare_threshold = 1
+
+    def check_indexes(self) -> bool:
+        """
+        Check that gallery.tags has a GIN index usable by the ?| tag filter
+
+        EHDB is read-only here, so a missing index is only reported; see
+        migrations/ehdb_gallery_tags_gin.sql for the recommended DDL.
+
+        Returns:
+            Whether a suitable index exists
+        """
+        rows = self.execute_query(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = 'gallery'"
+        )
+        for row in rows:
+            indexdef = row["indexdef"].lower()
+            # jsonb_path_ops indexes do not support the ?| operator
+            if (
+                "using gin" in indexdef
+                and "(tags" in indexdef
+                and "jsonb_path_ops" not in indexdef
+            ):
+                return True
+
+        self.logger.warning(
+            "No GIN index on gallery.tags, similar gallery search will use "
+            "sequential scans (see migrations/ehdb_gallery_tags_gin.sql)"
+        )
+        return False
+
     def close(self) -> None:
-        """Close database connection"""
-        if self._conn:
-            self._conn.close()
+        """Close database connection pool"""
+        if self._pool:
+            self._pool.close()
+            self._pool = None
             self.logger.info("EHDB database connection closed")
 
-    def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+    def _get_pool(self) -> ConnectionPool:
+        """Get connection pool, connecting on first use"""
+        if self._pool is None:
+            self.connect()
+
+        if self._pool is None:
+            raise RuntimeError("EHDB database connection not initialized")
+
+        return self._pool
+
+    def execute_query(
+        self,
+        query: str,
+        params: Union[tuple, Dict[str, Any]] = (),
+        prepare: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Execute query and return results
 
         Args:
             query: SQL query statement
-            params: Query parameters
+            params: Query parameters (tuple, or dict for named placeholders)
+            prepare: True to prepare the statement right away (hot queries),
+                None to follow the connection's prepare_threshold
 
         Returns:
             Query result list
         """
-        if self._conn is None:
-            self.connect()
+        # The pool rolls back and checks the connection on error
+        try:
+            with self._get_pool().connection() as conn, conn.cursor() as cursor:
+                cursor.execute(query, params, prepare=prepare)  # type: ignore[arg-type]
+                return cursor.fetchall()
+        except Exception as e:
+            self.logger.error(f"Query execution failed: {e}")
+            raise
 
-        if self._conn is None:
-            raise RuntimeError("EHDB database connection not initialized")
+    def stream_query(
+        self, query: str, params: Union[tuple, Dict[str, Any]] = ()
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute query with a server-side cursor and yield rows as fetched
 
+        The pooled connection stays checked out until iteration ends.
+
+        Args:
+            query: SQL query statement
+            params: Query parameters (tuple, or dict for named placeholders)
+
+        Yields:
+            Query result rows
+        """
         try:
-            with self._conn.cursor(row_factory=dict_row) as cursor:
-                cursor.execute(query, params)  # type: ignore[arg-type]
-                rows = cursor.fetchall()
-                return [self._normalize_row(dict(row)) for row in rows]
+            with self._get_pool().connection() as conn:
+                with conn.cursor(name="ehdb_stream") as cursor:
+                    cursor.itersize = self.STREAM_ITERSIZE
+                    cursor.execute(query, params)  # type: ignore[arg-type]
+                    yield from cursor
         except Exception as e:
             self.logger.error(f"Query execution failed: {e}")
-            if self._conn is not None:
-                self._conn.rollback()
             raise
 
     def get_gallery(self, gid: int) -> Optional[Dict[str, Any]]:
@@ -84,14 +194,12 @@ class EhdbDatabase:
         Returns:
             Gallery information dictionary
         """
-        query = """
-            SELECT gid, token, archiver_key, title, title_jpn, category,
-                   thumb, uploader, posted, filecount, filesize, expunged,
-                   removed, replaced, rating, torrentcount, tags
+        query = f"""
+            SELECT {_GALLERY_COLUMNS}
             FROM gallery
             WHERE gid = %s
         """
-        results = self.execute_query(query, (gid,))
+        results = self.execute_query(query, (gid,), prepare=True)
         return results[0] if results else None
 
     def get_galleries_by_ids(self, gids: List[int]) -> List[Dict[str, Any]]:
@@ -107,14 +215,32 @@ class EhdbDatabase:
         if not gids:
             return []
 
-        query = """
-            SELECT gid, token, archiver_key, title, title_jpn, category,
-                   thumb, uploader, posted, filecount, filesize, expunged,
-                   removed, replaced, rating, torrentcount, tags
+        query = f"""
+            SELECT {_GALLERY_COLUMNS}
             FROM gallery
             WHERE gid = ANY(%s)
         """
-        return self.execute_query(query, (gids,))
+        return self.execute_query(query, (gids,), prepare=True)
+
+    def iter_galleries_by_ids(self, gids: List[int]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream gallery information in batch (for callers that only iterate)
+
+        Args:
+            gids: Gallery ID list
+
+        Yields:
+            Gallery information
+        """
+        if not gids:
+            return
+
+        query = f"""
+            SELECT {_GALLERY_COLUMNS}
+            FROM gallery
+            WHERE gid = ANY(%s)
+        """
+        yield from self.stream_query(query, (gids,))
 
     def get_new_galleries(
         self, since_timestamp: int, limit: int = 1000
@@ -129,10 +255,8 @@ class EhdbDatabase:
         Returns:
             Gallery information list
         """
-        query = """
-            SELECT gid, token, archiver_key, title, title_jpn, category,
-                   thumb, uploader, posted, filecount, filesize, expunged,
-                   removed, replaced, rating, torrentcount, tags
+        query = f"""
+            SELECT {_GALLERY_COLUMNS}
             FROM gallery
             WHERE EXTRACT(EPOCH FROM posted)::bigint > %s
                 AND expunged = false
@@ -140,7 +264,7 @@ class EhdbDatabase:
             ORDER BY posted DESC
             LIMIT %s
         """
-        return self.execute_query(query, (since_timestamp, limit))
+        return self.execute_query(query, (since_timestamp, limit), prepare=True)
 
     def get_random_galleries(
         self, count: int = 100, min_rating: float = 3.0
@@ -148,6 +272,9 @@ class EhdbDatabase:
         """
         Get random galleries (for old gallery recommendations)
 
+        Samples a percentage of table blocks instead of sorting the whole
+        table; the sample grows until it yields enough galleries.
+
         Args:
             count: Count
             min_rating: Minimum rating
@@ -155,18 +282,21 @@ class EhdbDatabase:
         Returns:
             Gallery information list
         """
-        query = """
-            SELECT gid, token, archiver_key, title, title_jpn, category,
-                   thumb, uploader, posted, filecount, filesize, expunged,
-                   removed, replaced, rating, torrentcount, tags
-            FROM gallery
+        query = f"""
+            SELECT {_GALLERY_COLUMNS}
+            FROM gallery TABLESAMPLE SYSTEM (%s)
             WHERE expunged = false
                 AND removed = false
                 AND rating >= %s
             ORDER BY RANDOM()
             LIMIT %s
         """
-        return self.execute_query(query, (min_rating, count))
+        results: List[Dict[str, Any]] = []
+        for percent in self.RANDOM_SAMPLE_PERCENTS:
+            results = self.execute_query(query, (percent, min_rating, count))
+            if len(results) >= count:
+                break
+        return results
 
     def search_similar_galleries(
         self, tags: List[str], uploader: Optional[str] = None, limit: int = 100
@@ -182,32 +312,28 @@ class EhdbDatabase:
         Returns:
             Gallery information list
         """
-        # Use JSONB containment operator
-        query = """
-            SELECT gid, token, archiver_key, title, title_jpn, category,
-                   thumb, uploader, posted, filecount, filesize, expunged,
-                   removed, replaced, rating, torrentcount, tags,
-                   jsonb_array_length(
-                       (SELECT jsonb_agg(elem)
-                        FROM jsonb_array_elements(tags) elem
-                        WHERE elem IN (SELECT jsonb_array_elements(%s::jsonb)))
-                   ) as tag_match_count
+        # ?| filters on the tag array; matches are counted against the same
+        # text[] parameter instead of a nested jsonb subquery per row
+        query = f"""
+            SELECT {_GALLERY_COLUMNS},
+                   (SELECT count(*)
+                    FROM jsonb_array_elements_text(tags) t
+                    WHERE t = ANY(%(tags)s::text[])) AS tag_match_count
             FROM gallery
             WHERE expunged = false
                 AND removed = false
-                AND tags ?| %s
+                AND tags ?| %(tags)s::text[]
         """
 
-        params: List[Any] = [json.dumps(tags), tags]
+        params: Dict[str, Any] = {"tags": tags, "limit": limit}
 
         if uploader:
-            query += " AND uploader = %s"
-            params.append(uploader)
+            query += " AND uploader = %(uploader)s"
+            params["uploader"] = uploader
 
-        query += " ORDER BY tag_match_count DESC, rating DESC LIMIT %s"
-        params.append(limit)
+        query += " ORDER BY tag_match_count DESC, rating DESC LIMIT %(limit)s"
 
-        return self.execute_query(query, tuple(params))
+        return self.execute_query(query, params)
 
     def get_galleries_by_uploader(
         self, uploader: str, limit: int = 100
@@ -222,10 +348,8 @@ class EhdbDatabase:
         Returns:
             Gallery information list
         """
-        query = """
-            SELECT gid, token, archiver_key, title, title_jpn, category,
-                   thumb, uploader, posted, filecount, filesize, expunged,
-                   removed, replaced, rating, torrentcount, tags
+        query = f"""
+            SELECT {_GALLERY_COLUMNS}
             FROM gallery
             WHERE uploader = %s
                 AND expunged = false
@@ -234,28 +358,3 @@ class EhdbDatabase:
             LIMIT %s
         """
         return self.execute_query(query, (uploader, limit))
-
-    # ==================== Helper Methods ====================
-
-    def _normalize_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert database returned data to Python common types"""
-        if not row:
-            return row
-
-        normalized = dict(row)
-
-        for key, value in list(normalized.items()):
-            if isinstance(value, Decimal):
-                if key in ("rating", "avg_rating"):
-                    normalized[key] = float(value)
-                else:
-                    normalized[key] = int(value)
-
-        tags = normalized.get("tags")
-        if isinstance(tags, str):
-            try:
-                normalized["tags"] = json.loads(tags)
-            except Exception:
-                pass
-
-        return normalized
@@ -1,27 +1,58 @@
 """Content scorer - quality metrics, content features, recency"""
 
-import json
-from typing import List, Dict, Any
-from collections import Counter
+from typing import List, Dict, Any, FrozenSet, NamedTuple, Tuple
+from itertools import chain
 from datetime import datetime
 import numpy as np
 import logging
 
 
+class _QualityProfile(NamedTuple):
+    """User preference statistics (shared with readers, must not be modified)"""
+
+    avg_rating: float
+    rating_std: float
+    avg_filecount: int
+    # 10th / 90th percentile of page counts
+    filecount_range: Tuple[int, int]
+    # 1 / (2 * rating_std ** 2), reused for every candidate
+    inv_two_sigma2: float
+    preferred_languages: Dict[str, float]
+    preferred_language_keys: FrozenSet[str]
+    preferred_categories: Dict[str, float]
+
+
 class ContentScorer:
     """Content scorer"""
 
+    # Recency uses exponential decay per day since posting
+    # Within 30 days: 1.0, 90 days: 0.8, 180 days: 0.6, 365 days: 0.4
+    RECENCY_DECAY_FACTOR = 0.002  # Adjust decay speed
+    # Days covered by the recency lookup table (older galleries use the last entry)
+    RECENCY_TABLE_DAYS = 3650
+
     def __init__(self):
         """Initialize content scorer"""
         self.logger = logging.getLogger(__name__)
 
-        # User preference statistics
-        self.avg_rating = 0.0
-        self.rating_std = 0.0
-        self.avg_filecount = 0
-        self.filecount_range = (0, 10000)
-        self.preferred_languages = {}
-        self.preferred_categories = {}
+        # User preference statistics, replaced as a whole on rebuild: profiles
+        # are built in worker threads while others score
+        self._profile = _QualityProfile(
+            avg_rating=0.0,
+            rating_std=0.0,
+            avg_filecount=0,
+            filecount_range=(0, 10000),
+            inv_two_sigma2=0.0,
+            preferred_languages={},
+            preferred_language_keys=frozenset(),
+            preferred_categories={},
+        )
+        # Recency score by whole days since posting, limited to [0.2, 1.0]
+        self._recency_table = np.clip(
+            np.exp(-self.RECENCY_DECAY_FACTOR * np.arange(self.RECENCY_TABLE_DAYS + 1)),
+            0.2,
+            1.0,
+        )
 
     def build_quality_profile(self, favorite_galleries: List[Dict[str, Any]]) -> None:
         """
@@ -35,151 +66,193 @@ class ContentScorer:
 
         # Rating preferences
         ratings = [g.get("rating", 0) for g in favorite_galleries]
-        self.avg_rating = np.mean(ratings) if ratings else 0.0
-        self.rating_std = np.std(ratings) if len(ratings) > 1 else 0.5
+        avg_rating = float(np.mean(ratings))
+        rating_std = float(np.std(ratings)) if len(ratings) > 1 else 0.5
 
         # Page count preferences
         filecounts = [g.get("filecount", 0) for g in favorite_galleries]
-        self.avg_filecount = int(np.mean(filecounts)) if filecounts else 0
-        self.filecount_range = (
-            int(np.percentile(filecounts, 10)) if filecounts else 0,
-            int(np.percentile(filecounts, 90)) if filecounts else 10000,
+        # 10th / 90th percentile by direct index into the sorted counts
+        sorted_filecounts = sorted(filecounts)
+        n = len(sorted_filecounts)
+        with np.errstate(divide="ignore"):
+            inv_two_sigma2 = float(np.float64(1.0) / (2 * rating_std**2))
+
+        # Language preferences (count all tags at once, prefix-test unique tags only)
+        all_tags = np.array(
+            list(chain.from_iterable(g["tags"] for g in favorite_galleries)),
+            dtype=str,
         )
-
-        # Language preferences
-        language_counter = Counter()
-        for gallery in favorite_galleries:
-            tags = gallery.get("tags", [])
-            if isinstance(tags, str):
-                try:
-                    tags = json.loads(tags)
-                except:
-                    tags = []
-
-            for tag in tags:
-                if tag.startswith("language:") or tag.startswith("lang:"):
-                    language_counter[tag] += 1
-
-        total = sum(language_counter.values())
-        if total > 0:
-            self.preferred_languages = {
-                lang: count / total for lang, count in language_counter.items()
-            }
+        preferred_languages: Dict[str, float] = {}
+        if all_tags.size:
+            unique_tags, tag_counts = np.unique(all_tags, return_counts=True)
+            is_language = np.char.startswith(unique_tags, "language:") | (
+                np.char.startswith(unique_tags, "lang:")
+            )
+            language_counts = tag_counts[is_language]
+            total = int(language_counts.sum())
+            if total > 0:
+                preferred_languages = dict(
+                    zip(
+                        unique_tags[is_language].tolist(),
+                        (language_counts / total).tolist(),
+                    )
+                )
 
         # Category preferences
-        category_counter = Counter(g.get("category", "") for g in favorite_galleries)
+        categories, category_counts = np.unique(
+            np.array([g.get("category") or "" for g in favorite_galleries], dtype=str),
+            return_counts=True,
+        )
         total = len(favorite_galleries)
-        self.preferred_categories = {
-            cat: count / total for cat, count in category_counter.items() if cat
+        preferred_categories = {
+            cat: count / total
+            for cat, count in zip(categories.tolist(), category_counts.tolist())
+            if cat
         }
 
+        profile = _QualityProfile(
+            avg_rating=avg_rating,
+            rating_std=rating_std,
+            avg_filecount=int(sum(filecounts) / n),
+            filecount_range=(
+                int(sorted_filecounts[n // 10]),
+                int(sorted_filecounts[n * 9 // 10]),
+            ),
+            inv_two_sigma2=inv_two_sigma2,
+            preferred_languages=preferred_languages,
+            preferred_language_keys=frozenset(preferred_languages),
+            preferred_categories=preferred_categories,
+        )
+        self._profile = profile
+
         self.logger.info(
-            f"Quality preference profile construction completed: avg_rating={self.avg_rating:.2f}, "
-            f"avg_filecount={self.avg_filecount}, "
-            f"language_preferences={len(self.preferred_languages)}"
+            f"Quality preference profile construction completed: avg_rating={profile.avg_rating:.2f}, "
+            f"avg_filecount={profile.avg_filecount}, "
+            f"language_preferences={len(profile.preferred_languages)}"
         )
 
-    def compute_quality_score(self, gallery: Dict[str, Any]) -> float:
+    def compute_quality_scores(
+        self, ratings: np.ndarray, filecounts: np.ndarray
+    ) -> np.ndarray:
         """
-        Compute gallery quality score
+        Compute quality scores of many galleries at once
 
         Args:
-            gallery: Candidate gallery information
+            ratings: Candidate gallery ratings
+            filecounts: Candidate gallery page counts
 
         Returns:
-            Quality score (0-1)
+            Quality scores (0-1), one per gallery
         """
-        scores = []
+        profile = self._profile
 
         # 1. Rating matching
-        rating = gallery.get("rating", 0)
-        if self.avg_rating > 0:
+        if profile.avg_rating > 0:
             # Use Gaussian distribution, prefer ratings within range
-            rating_diff = abs(rating - self.avg_rating)
-            rating_score = np.exp(-(rating_diff**2) / (2 * self.rating_std**2))
-            scores.append(rating_score)
+            rating_scores = np.exp(
+                -((ratings - profile.avg_rating) ** 2) * profile.inv_two_sigma2
+            )
         else:
             # Simple linear mapping
-            scores.append(rating / 5.0)
+            rating_scores = ratings / 5.0
 
         # 2. Page count matching
-        filecount = gallery.get("filecount", 0)
-        if self.filecount_range[0] <= filecount <= self.filecount_range[1]:
-            filecount_score = 1.0
-        elif filecount < self.filecount_range[0]:
-            filecount_score = 0.7
-        else:
-            filecount_score = 0.8
-        scores.append(filecount_score)
+        filecount_low, filecount_high = profile.filecount_range
+        filecount_scores = np.where(
+            filecounts < filecount_low,
+            0.7,
+            np.where(filecounts > filecount_high, 0.8, 1.0),
+        )
 
-        return float(np.mean(scores)) if scores else 0.5
+        return (rating_scores + filecount_scores) / 2
 
-    def compute_content_score(self, gallery: Dict[str, Any]) -> float:
+    def compute_content_scores(
+        self, tags_list: List[List[str]], categories: List[str]
+    ) -> np.ndarray:
         """
-        Compute content feature score
+        Compute content feature scores of many galleries at once
 
         Args:
-            gallery: Candidate gallery information
+            tags_list: Tag list of each candidate gallery
+            categories: Category of each candidate gallery
 
         Returns:
-            Content score (0-1)
+            Content scores (0-1), one per gallery
         """
-        scores = []
-
-        # 1. Language matching
-        tags = gallery.get("tags", [])
-        if isinstance(tags, str):
-            try:
-                tags = json.loads(tags)
-            except:
-                tags = []
-
-        language_score = 0.0
-        for tag in tags:
-            if tag in self.preferred_languages:
-                language_score = max(language_score, self.preferred_languages[tag])
-
-        # If no language tag, give neutral score
-        scores.append(language_score if language_score > 0 else 0.5)
+        count = len(categories)
+        profile = self._profile
+        language_keys = profile.preferred_language_keys
+        preferred_languages = profile.preferred_languages
+        preferred_categories = profile.preferred_categories
+
+        # 1. Language matching (no language tag gives neutral score)
+        language_scores = np.fromiter(
+            (
+                max(
+                    (preferred_languages[t] for t in language_keys.intersection(tags)),
+                    default=0.0,
+                )
+                for tags in tags_list
+            ),
+            dtype=float,
+            count=count,
+        )
+        language_scores[language_scores <= 0] = 0.5
 
         # 2. Category matching
-        category = gallery.get("category", "")
-        category_score = self.preferred_categories.get(category, 0.3)
-        scores.append(category_score)
+        category_scores = np.fromiter(
+            (preferred_categories.get(c, 0.3) for c in categories),
+            dtype=float,
+            count=count,
+        )
 
-        return float(np.mean(scores)) if scores else 0.5
+        return (language_scores + category_scores) / 2
 
-    def compute_recency_score(self, gallery: Dict[str, Any]) -> float:
+    @staticmethod
+    def get_posted_timestamp(gallery: Dict[str, Any]) -> float:
         """
-        Compute recency score
+        Get gallery posted time as Unix timestamp
 
         Args:
-            gallery: Candidate gallery information
+            gallery: Gallery information (posted as epoch seconds from EHDB,
+                datetime or ISO string)
 
         Returns:
-            Recency score (0-1)
+            Unix timestamp, NaN if unknown
         """
         posted = gallery.get("posted")
         if not posted:
-            return 0.5
+            return np.nan
+        if isinstance(posted, (int, float)):
+            return float(posted)
 
         # Convert to datetime
         if isinstance(posted, str):
             try:
                 posted = datetime.fromisoformat(posted.replace("Z", "+00:00"))
-            except:
-                return 0.5
+            except ValueError:
+                return np.nan
+        return posted.timestamp()
 
-        # Calculate day difference
-        now = datetime.now(posted.tzinfo) if posted.tzinfo else datetime.now()
-        days_diff = (now - posted).days
-
-        # Use exponential decay
-        # Within 30 days: 1.0, 90 days: 0.8, 180 days: 0.6, 365 days: 0.4
-        if days_diff < 0:
-            return 1.0
+    def compute_recency_scores(
+        self, posted_ts: np.ndarray, now_ts: float
+    ) -> np.ndarray:
+        """
+        Compute recency scores of many galleries at once
 
-        decay_factor = 0.002  # Adjust decay speed
-        score = np.exp(-decay_factor * days_diff)
+        Args:
+            posted_ts: Posted Unix timestamps (NaN if unknown)
+            now_ts: Current Unix timestamp, shared by the whole batch
 
-        return max(0.2, min(1.0, score))  # Limit range
+        Returns:
+            Recency scores (0-1), one per gallery
+        """
+        # Whole days since posting, future posts count as new
+        unknown = np.isnan(posted_ts)
+        days_diff = np.clip(
+            np.floor((now_ts - np.where(unknown, now_ts, posted_ts)) / 86400),
+            0,
+            self.RECENCY_TABLE_DAYS,
+        ).astype(np.intp)
+
+        return np.where(unknown, 0.5, self._recency_table[days_diff])
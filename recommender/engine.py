@@ -1,8 +1,11 @@
 """Recommendation engine - integrates all analyzers"""
 
-import json
 from typing import List, Dict, Any, Optional, Tuple
 import logging
+import threading
+import time
+
+import numpy as np
 
 from .tag_analyzer import TagAnalyzer
 from .uploader_analyzer import UploaderAnalyzer
@@ -45,13 +48,18 @@ class RecommendationEngine:
         self.immediate_push_threshold = config.get("immediate_push_threshold", 0.85)
 
         self._is_initialized = False
+        # Serializes profile writers (rebuild, feedback update), which run in
+        # worker threads: held from reading the feedback stats until the
+        # profiles are published, so no feedback is lost under a rebuild.
+        # Scoring does not take it, the analyzers publish atomically
+        self._profile_lock = threading.Lock()
 
     def initialize(self) -> None:
         """Initialize recommendation engine (build user profile)"""
         self.logger.info("Starting recommendation engine initialization...")
 
         # Get user favorites
-        favorite_gids = [gid for gid, _ in self.database.get_all_favorites()]
+        favorite_gids = list(self.database.get_all_favorite_gids())
 
         if not favorite_gids:
             self.logger.warning(
@@ -68,20 +76,21 @@ class RecommendationEngine:
             self._is_initialized = True
             return
 
-        # Get feedback statistics (for calculating feedback multiplier)
-        feedback_stats = self.database.get_all_tag_feedback_stats()
+        with self._profile_lock:
+            # Get feedback statistics (for calculating feedback multiplier)
+            feedback_stats = self.database.get_all_tag_feedback_stats()
 
-        # Build profiles for each analyzer
-        self.tag_analyzer.build_user_profile(favorite_galleries, feedback_stats)
-        self.uploader_analyzer.build_uploader_profile(favorite_galleries)
-        self.content_scorer.build_quality_profile(favorite_galleries)
+            # Build profiles for each analyzer
+            self.tag_analyzer.build_user_profile(favorite_galleries, feedback_stats)
+            self.uploader_analyzer.build_uploader_profile(favorite_galleries)
+            self.content_scorer.build_quality_profile(favorite_galleries)
 
-        # Sync base weights to database (only update tags without feedback)
-        # Note: Need to calculate pure base weights (excluding feedback) for sync
-        base_weights = self.tag_analyzer._get_base_weights_for_sync(favorite_galleries)
-        self.database.sync_tag_preferences(base_weights)
+            # Sync base weights to database (only update tags without feedback)
+            # Note: Pure base weights (excluding feedback) were computed with the profile
+            base_weights = self.tag_analyzer._get_base_weights_for_sync()
+            self.database.sync_tag_preferences(base_weights)
 
-        self._is_initialized = True
+            self._is_initialized = True
         self.logger.info("Recommendation engine initialization completed")
 
     def compute_recommendation_score(
@@ -96,54 +105,160 @@ class RecommendationEngine:
         Returns:
             (Total score, detailed score dictionary)
         """
+        return self.compute_recommendation_scores([gallery])[0]
+
+    def compute_recommendation_scores(
+        self, galleries: List[Dict[str, Any]], min_score: Optional[float] = None
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Compute recommendation scores of a batch of galleries
+
+        Args:
+            galleries: Gallery information list
+            min_score: If given, galleries scoring below it are returned as
+                (0.0, {"rejected_early": True}); those that cannot reach it even
+                with full marks on the remaining components skip the rest
+
+        Returns:
+            [(Total score, detailed score dictionary), ...] in input order
+        """
         if not self._is_initialized:
             self.initialize()
 
-        # Parse tags
-        tags = gallery.get("tags", [])
-        if isinstance(tags, str):
-            try:
-                tags = json.loads(tags)
-            except:
-                tags = []
+        if not galleries:
+            return []
 
-        # 1. Tag similarity
-        tag_score = self.tag_analyzer.compute_tag_similarity(tags)
+        results: List[Tuple[float, Dict[str, Any]]] = [
+            (0.0, {"rejected_early": True})
+        ] * len(galleries)
+
+        # Structure of arrays: one column per field used in scoring
+        columns = self._to_columns(galleries)
+        tags_list = columns["tags"]
+        positions = np.arange(len(galleries))
+
+        # 1. Tag similarity (TF-IDF transform of the whole batch at once)
+        tag_scores = self.tag_analyzer.compute_tag_similarities(tags_list)
+
+        # Every component scores at most 1, so the total is bounded by the
+        # partial score plus the weights still to come
+        remaining_weight = (
+            self.uploader_weight
+            + self.quality_weight
+            + self.content_weight
+            + self.recency_weight
+        )
+        if min_score is not None:
+            keep = np.flatnonzero(
+                tag_scores * self.tag_weight + remaining_weight >= min_score
+            )
+            positions, tag_scores = positions[keep], tag_scores[keep]
+        remaining_weight -= self.uploader_weight
 
         # 2. Uploader matching
-        uploader = gallery.get("uploader") or ""
-        uploader_score = self.uploader_analyzer.compute_uploader_score(uploader)
+        uploaders = columns["uploader"]
+        uploader_scores = self.uploader_analyzer.compute_uploader_scores(
+            [uploaders[i] for i in positions.tolist()]
+        )
+        if min_score is not None:
+            keep = np.flatnonzero(
+                tag_scores * self.tag_weight
+                + uploader_scores * self.uploader_weight
+                + remaining_weight
+                >= min_score
+            )
+            positions = positions[keep]
+            tag_scores, uploader_scores = tag_scores[keep], uploader_scores[keep]
+
+        if not len(positions):
+            return results
 
-        # 3. Quality metrics
-        quality_score = self.content_scorer.compute_quality_score(gallery)
+        index = positions.tolist()
+
+        # 3. Quality metrics (vectorized over the batch)
+        quality_scores = self.content_scorer.compute_quality_scores(
+            columns["rating"][positions], columns["filecount"][positions]
+        )
 
         # 4. Content features
-        content_score = self.content_scorer.compute_content_score(gallery)
+        content_scores = self.content_scorer.compute_content_scores(
+            [tags_list[i] for i in index], [columns["category"][i] for i in index]
+        )
 
         # 5. Recency
-        recency_score = self.content_scorer.compute_recency_score(gallery)
+        recency_scores = self.content_scorer.compute_recency_scores(
+            columns["posted"][positions], time.time()
+        )
 
         # Weighted total score
-        total_score = (
-            tag_score * self.tag_weight
-            + uploader_score * self.uploader_weight
-            + quality_score * self.quality_weight
-            + content_score * self.content_weight
-            + recency_score * self.recency_weight
+        score_matrix = np.column_stack(
+            (
+                tag_scores,
+                uploader_scores,
+                quality_scores,
+                content_scores,
+                recency_scores,
+            )
+        )
+        total_scores = score_matrix @ np.array(
+            [
+                self.tag_weight,
+                self.uploader_weight,
+                self.quality_weight,
+                self.content_weight,
+                self.recency_weight,
+            ]
         )
 
-        # Detailed scores
-        details = {
-            "tag_score": round(tag_score, 3),
-            "uploader_score": round(uploader_score, 3),
-            "quality_score": round(quality_score, 3),
-            "content_score": round(content_score, 3),
-            "recency_score": round(recency_score, 3),
-            "total_score": round(total_score, 3),
-            "matched_tags": self.tag_analyzer.explain_similarity(tags, 5),
-        }
+        # Threshold compare on the whole batch; details only for the rest
+        if min_score is not None:
+            passed = total_scores >= min_score
+            positions = positions[passed]
+            total_scores, score_matrix = total_scores[passed], score_matrix[passed]
+
+        for i, total, (tag_s, uploader_s, quality_s, content_s, recency_s) in zip(
+            positions.tolist(), total_scores.tolist(), score_matrix.tolist()
+        ):
+            # Detailed scores
+            details = {
+                "tag_score": round(tag_s, 3),
+                "uploader_score": round(uploader_s, 3),
+                "quality_score": round(quality_s, 3),
+                "content_score": round(content_s, 3),
+                "recency_score": round(recency_s, 3),
+                "total_score": round(total, 3),
+                "matched_tags": self.tag_analyzer.explain_similarity(tags_list[i], 5),
+            }
+            results[i] = (total, details)
+
+        return results
+
+    def _to_columns(self, galleries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Split gallery dicts into per-field columns for batch scoring
+
+        Args:
+            galleries: Gallery information list
 
-        return total_score, details
+        Returns:
+            {field: column}, numeric fields as NumPy arrays, others as lists
+        """
+        count = len(galleries)
+        posted_timestamp = self.content_scorer.get_posted_timestamp
+        return {
+            "tags": [g["tags"] for g in galleries],
+            "uploader": [g.get("uploader") or "" for g in galleries],
+            "category": [g.get("category", "") for g in galleries],
+            "rating": np.fromiter(
+                (g.get("rating") or 0 for g in galleries), dtype=float, count=count
+            ),
+            "filecount": np.fromiter(
+                (g.get("filecount") or 0 for g in galleries), dtype=float, count=count
+            ),
+            "posted": np.fromiter(
+                (posted_timestamp(g) for g in galleries), dtype=float, count=count
+            ),
+        }
 
     def recommend_new_galleries(
         self, since_timestamp: int, limit: int = 100
@@ -207,12 +322,7 @@ class RecommendationEngine:
             return []
 
         # Extract tags and uploader
-        tags = base_gallery.get("tags", [])
-        if isinstance(tags, str):
-            try:
-                tags = json.loads(tags)
-            except:
-                tags = []
+        tags = base_gallery["tags"]
 
         uploader = base_gallery.get("uploader")
 
@@ -241,22 +351,25 @@ class RecommendationEngine:
         """
         recommendations = []
 
-        for gallery in galleries:
-            gid = gallery["gid"]
+        if not self._is_initialized:
+            self.initialize()
+
+        # Favorited, feedback given, or already recommended within validity
+        # period (manual requests may repeat recommendations)
+        excluded = self.database.get_excluded_gids(
+            [g["gid"] for g in galleries],
+            self.config.get("recommendation_expiry_days"),
+            include_recommended=source != "manual",
+        )
 
-            # Filter: favorited, feedback given, already recommended
-            if self.database.is_favorited(gid):
-                continue
-            if self.database.get_feedback(gid) is not None:
-                continue
-            # Check if already recommended within validity period
-            expiry_days = self.config.get("recommendation_expiry_days")
-            if source != "manual" and self.database.is_recommended(gid, expiry_days):
-                continue
+        candidates = [g for g in galleries if g["gid"] not in excluded]
 
-            # Calculate score
-            score, details = self.compute_recommendation_score(gallery)
+        # Calculate scores for all remaining candidates at once
+        scored = self.compute_recommendation_scores(
+            candidates, self.min_score_threshold
+        )
 
+        for gallery, (score, details) in zip(candidates, scored):
             # Filter low scores
             if score < self.min_score_threshold:
                 continue
@@ -309,13 +422,44 @@ class RecommendationEngine:
             return
 
         # Learn and update
-        self.feedback_learner.learn_from_feedback(gid, rating, gallery)
+        with self._profile_lock:
+            feedback_stats = self.feedback_learner.learn_from_feedback(
+                gid, rating, gallery
+            )
+
+            # Update profile: only the weights of this gallery's tags change
+            is_initialized = self._is_initialized
+            if is_initialized:
+                self.tag_analyzer.update_tag_feedback(feedback_stats)
 
-        # Re-initialize (update profile)
-        self.initialize()
+        if not is_initialized:
+            self.initialize()
 
         self.logger.info(f"Feedback handling completed: gid={gid}, rating={rating}")
 
     def should_push_immediately(self, score: float) -> bool:
         """Determine if should push immediately"""
         return score >= self.immediate_push_threshold
+
+    def split_by_push_threshold(
+        self, recommendations: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split recommendations by the immediate push threshold
+
+        Args:
+            recommendations: Recommendation list
+
+        Returns:
+            (recommendations to push immediately, the rest), order preserved
+        """
+        scores = np.fromiter(
+            (rec["score"] for rec in recommendations),
+            dtype=np.float64,
+            count=len(recommendations),
+        )
+        immediate_mask = scores >= self.immediate_push_threshold
+
+        immediate = [recommendations[i] for i in np.flatnonzero(immediate_mask)]
+        rest = [recommendations[i] for i in np.flatnonzero(~immediate_mask)]
+        return immediate, rest
@@ -1,7 +1,8 @@
 """Feedback learner - dynamic weight adjustment"""
 
-import json
-from typing import List, Dict, Any
+from collections import defaultdict
+import heapq
+from typing import List, Dict, Any, Tuple
 import logging
 
 
@@ -25,7 +26,7 @@ class FeedbackLearner:
 
     def learn_from_feedback(
         self, gid: int, rating: int, gallery_info: Dict[str, Any]
-    ) -> None:
+    ) -> Dict[str, Dict[str, int]]:
         """
         Learn from user feedback, update tag weights
 
@@ -33,21 +34,25 @@ class FeedbackLearner:
             gid: Gallery ID
             rating: Rating (1=like, -1=dislike)
             gallery_info: Gallery information
+
+        Returns:
+            Updated feedback statistics of the gallery's tags
+            {tag: {'positive_count': int, 'negative_count': int}}
         """
-        tags = gallery_info.get("tags", [])
-        if isinstance(tags, str):
-            try:
-                tags = json.loads(tags)
-            except:
-                tags = []
+        tags = gallery_info["tags"]
 
         uploader = gallery_info.get("uploader")
 
         is_positive = rating > 0
 
         # Update tag weights
+        feedback_stats = {}
         for tag in tags:
-            self._update_tag_weight(tag, is_positive)
+            pos_count, neg_count = self._update_tag_weight(tag, is_positive)
+            feedback_stats[tag] = {
+                "positive_count": pos_count,
+                "negative_count": neg_count,
+            }
 
         # Update uploader preference (recorded in database for uploader analyzer)
         if uploader:
@@ -58,43 +63,31 @@ class FeedbackLearner:
             f"tags={len(tags)}, uploader={uploader}"
         )
 
-    def _update_tag_weight(self, tag: str, is_positive: bool) -> None:
+        return feedback_stats
+
+    def _update_tag_weight(self, tag: str, is_positive: bool) -> Tuple[int, int]:
         """
-        Update feedback count for a single tag (weights will be recalculated on next startup based on feedback stats)
+        Update feedback count for a single tag (the profile weight is derived from feedback stats)
 
         Args:
             tag: Tag name
             is_positive: Whether positive feedback
+
+        Returns:
+            (positive count, negative count) after the update
         """
-        # Get current preference
-        pref = self.database.get_tag_preference(tag)
-
-        if pref:
-            # Preserve existing base weight (do not modify)
-            base_weight = pref["weight"]
-            pos_count = pref["positive_count"]
-            neg_count = pref["negative_count"]
-        else:
-            # If new tag, need to get base weight first (may need from tag_analyzer)
-            # Set to 1.0 for now, will be updated by sync_tag_preferences on next startup
-            base_weight = 1.0
-            pos_count = 0
-            neg_count = 0
-
-        # Update feedback count
-        if is_positive:
-            pos_count += 1
-        else:
-            neg_count += 1
-
-        # Update database (preserve base weight, only update feedback count)
-        # Note: weight field temporarily keeps original value, actual weight will be recalculated on next startup
-        self.database.update_tag_preference(tag, base_weight, pos_count, neg_count)
+        # Atomic increment in the database: feedback of galleries sharing tags
+        # may be handled concurrently. The weight field keeps the base weight
+        # (1.0 for a new tag until sync_tag_preferences on next startup),
+        # feedback is applied through the counts
+        pos_count, neg_count = self.database.increment_tag_feedback(tag, is_positive)
 
         self.logger.debug(
             f"Tag feedback updated: {tag} pos={pos_count}, neg={neg_count}"
         )
 
+        return pos_count, neg_count
+
     def _update_uploader_preference(self, uploader: str, is_positive: bool) -> None:
         """
         Record uploader feedback (actual weight updates handled by UploaderAnalyzer)
@@ -125,15 +118,17 @@ class FeedbackLearner:
 
         self.logger.info(f"Starting batch learning, {len(all_feedback)} feedback items")
 
-        # Batch get gallery information
-        gids = [gid for gid, _ in all_feedback]
-        galleries = ehdb_database.get_galleries_by_ids(gids)
-        gallery_dict = {g["gid"]: g for g in galleries}
+        # Aggregate tag feedback counts over all galleries, then write once
+        ratings = dict(all_feedback)
+        counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for gallery in ehdb_database.iter_galleries_by_ids(list(ratings)):
+            column = 0 if ratings[gallery["gid"]] > 0 else 1
+            for tag in gallery["tags"]:
+                counts[tag][column] += 1
 
-        # Learn one by one
-        for gid, rating in all_feedback:
-            if gid in gallery_dict:
-                self.learn_from_feedback(gid, rating, gallery_dict[gid])
+        self.database.add_tag_feedback_counts(
+            {tag: (pos, neg) for tag, (pos, neg) in counts.items()}
+        )
 
         self.logger.info("Batch learning completed")
 
@@ -150,9 +145,7 @@ class FeedbackLearner:
         all_prefs = self.database.get_all_tag_preferences()
 
         # Sort by weight
-        sorted_tags = sorted(all_prefs.items(), key=lambda x: x[1], reverse=True)[
-            :top_n
-        ]
+        sorted_tags = heapq.nlargest(top_n, all_prefs.items(), key=lambda x: x[1])
 
         return {
             "top_tags": [{"tag": tag, "weight": weight} for tag, weight in sorted_tags],
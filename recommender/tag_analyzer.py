@@ -1,11 +1,11 @@
 """Tag analyzer - compute tag similarity using TF-IDF"""
 
-import json
-from typing import List, Dict, Any, Optional, cast
+from typing import List, Dict, Any, Optional, Tuple, cast
 from collections import Counter
+import heapq
+from itertools import chain
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 import logging
 from scipy.sparse import csr_matrix
 
@@ -27,13 +27,55 @@ class TagAnalyzer:
         "cosplayer": 0.7,
         "reclass": 0.5,
     }
+    # Namespace -> id, and weight table indexed by id (last entry: unknown namespace)
+    _NAMESPACE_IDS = {ns: i for i, ns in enumerate(NAMESPACE_WEIGHTS)}
+    _NAMESPACE_WEIGHT_TABLE = np.array(
+        list(NAMESPACE_WEIGHTS.values()) + [1.0], dtype=np.float64
+    )
+
+    # Feedback multiplier: per-feedback adjustment, decayed by earlier feedback
+    FEEDBACK_POSITIVE_DELTA = 0.1
+    FEEDBACK_NEGATIVE_DELTA = 0.15
+    FEEDBACK_DECAY = 0.9
+
+    # Tags present in more than this fraction of favorites are left out of TF-IDF
+    TFIDF_MAX_DF = 0.8
 
     def __init__(self):
         """Initialize tag analyzer"""
         self.logger = logging.getLogger(__name__)
-        self.user_tag_weights: Dict[str, float] = {}
-        self.vectorizer: Optional[TfidfVectorizer] = None
-        self.user_vector: Optional[np.ndarray] = None
+        # Profile rebuilds and feedback updates run in worker threads while
+        # others score: each group of related fields is published as one tuple
+        # so readers never mix builds. Writers must be serialized by the caller
+        # (RecommendationEngine holds its profile lock)
+        # (tag weights, tag -> index, weight array indexed by tag, total weight)
+        self._weight_state: Tuple[
+            Dict[str, float], Dict[str, int], np.ndarray, float
+        ] = (
+            {},
+            {},
+            np.zeros(0),
+            0.0,
+        )
+        # (normalized base weights, feedback-adjusted weights before the final
+        # normalization), kept for incremental feedback updates
+        self._feedback_state: Tuple[Dict[str, float], Dict[str, float]] = ({}, {})
+        # (TF-IDF vocabulary tag -> column, IDF per column, user profile vector)
+        self._tfidf_state: Tuple[Dict[str, int], np.ndarray, Optional[np.ndarray]] = (
+            {},
+            np.zeros(0, dtype=np.float32),
+            None,
+        )
+
+    @property
+    def user_tag_weights(self) -> Dict[str, float]:
+        """Current tag weights of the user profile"""
+        return self._weight_state[0]
+
+    @property
+    def user_vector(self) -> Optional[np.ndarray]:
+        """Current TF-IDF profile vector (None until built)"""
+        return self._tfidf_state[2]
 
     def extract_tags_from_galleries(
         self, galleries: List[Dict[str, Any]]
@@ -49,12 +91,7 @@ class TagAnalyzer:
         """
         all_tags = []
         for gallery in galleries:
-            tags = gallery.get("tags", [])
-            if isinstance(tags, str):
-                try:
-                    tags = json.loads(tags)
-                except:
-                    tags = []
+            tags = gallery["tags"]
             all_tags.append(tags)
         return all_tags
 
@@ -74,63 +111,82 @@ class TagAnalyzer:
             Tag weight dictionary (base weight * feedback multiplier)
         """
         if not favorite_galleries:
+            self._feedback_state = ({}, {})
             return {}
 
         if feedback_stats is None:
             feedback_stats = {}
 
-        # Count tag frequency
-        tag_counter = Counter()
-        for gallery in favorite_galleries:
-            tags = gallery.get("tags", [])
-            if isinstance(tags, str):
-                try:
-                    tags = json.loads(tags)
-                except:
-                    tags = []
-            tag_counter.update(tags)
-
-        # Calculate base weights (TF * namespace weight)
-        base_weights = {}
-        for tag, count in tag_counter.items():
-            # Base frequency weight
-            tf = count / len(favorite_galleries)
-
-            # Namespace weight
-            namespace = tag.split(":", 1)[0] if ":" in tag else "other"
-            ns_weight = self.NAMESPACE_WEIGHTS.get(namespace, 1.0)
-
-            # Base weight (excluding feedback)
-            base_weights[tag] = tf * ns_weight
+        tags, base_array = self._compute_base_weight_array(favorite_galleries)
+
+        # Feedback multiplier per tag, applied to all base weights at once
+        pos_counts = np.zeros(len(tags), dtype=np.int64)
+        neg_counts = np.zeros(len(tags), dtype=np.int64)
+        for i, tag in enumerate(tags):
+            stats = feedback_stats.get(tag)
+            if stats:
+                pos_counts[i] = stats.get("positive_count", 0)
+                neg_counts[i] = stats.get("negative_count", 0)
+        adjusted_array = base_array * self._compute_feedback_multipliers(
+            pos_counts, neg_counts
+        )
 
-        # Normalize base weights
-        max_base_weight = max(base_weights.values()) if base_weights else 1.0
-        base_weights = {k: v / max_base_weight for k, v in base_weights.items()}
-
-        # Calculate feedback multiplier from feedback statistics and apply to base weights
-        tag_weights = {}
-        for tag, base_weight in base_weights.items():
-            stats = feedback_stats.get(tag, {})
-            pos_count = stats.get("positive_count", 0)
-            neg_count = stats.get("negative_count", 0)
-
-            # Calculate feedback multiplier (using similar logic to feedback_learner)
-            feedback_multiplier = self._compute_feedback_multiplier(
-                pos_count, neg_count
+        base_weights = dict(zip(tags, base_array.tolist()))
+        tag_weights = dict(zip(tags, adjusted_array.tolist()))
+
+        normalized_weights = self._normalize_tag_weights(tag_weights)
+        self._feedback_state = (base_weights, tag_weights)
+        self._set_user_tag_weights(normalized_weights)
+        tag_weights = normalized_weights
+        self.logger.info(f"Tag weight calculation completed, {len(tag_weights)} tags")
+
+        return tag_weights
+
+    def update_tag_feedback(self, feedback_stats: Dict[str, Dict[str, int]]) -> None:
+        """
+        Apply new feedback counts of some tags without rebuilding the profile
+
+        Args:
+            feedback_stats: Updated statistics {tag: {'positive_count': int, 'negative_count': int}}
+        """
+        base_weights, adjusted_weights = self._feedback_state
+        # Updated on a copy, the published dict may be in use by a reader
+        adjusted_weights = dict(adjusted_weights)
+        changed = False
+        for tag, stats in feedback_stats.items():
+            base_weight = base_weights.get(tag)
+            if base_weight is None:
+                # Tag not in favorites, not part of the profile
+                continue
+            adjusted_weights[tag] = base_weight * self._compute_feedback_multiplier(
+                stats.get("positive_count", 0), stats.get("negative_count", 0)
             )
+            changed = True
 
-            # Final weight = base weight * feedback multiplier
-            tag_weights[tag] = base_weight * feedback_multiplier
+        if changed:
+            self._feedback_state = (base_weights, adjusted_weights)
+            self._set_user_tag_weights(self._normalize_tag_weights(adjusted_weights))
 
-        # Normalize again (after feedback adjustment)
+    @staticmethod
+    def _normalize_tag_weights(tag_weights: Dict[str, float]) -> Dict[str, float]:
+        """Normalize again (after feedback adjustment)"""
         max_weight = max(tag_weights.values()) if tag_weights else 1.0
         if max_weight > 0:
-            tag_weights = {k: v / max_weight for k, v in tag_weights.items()}
-
-        self.user_tag_weights = tag_weights
-        self.logger.info(f"Tag weight calculation completed, {len(tag_weights)} tags")
-
-        return tag_weights
+            return {k: v / max_weight for k, v in tag_weights.items()}
+        return dict(tag_weights)
+
+    def _set_user_tag_weights(self, tag_weights: Dict[str, float]) -> None:
+        """Publish tag weights with the tag -> index map and weight array used in scoring"""
+        tag_index = {tag: i for i, tag in enumerate(tag_weights)}
+        weight_array = np.fromiter(
+            tag_weights.values(), dtype=np.float64, count=len(tag_weights)
+        )
+        self._weight_state = (
+            tag_weights,
+            tag_index,
+            weight_array,
+            float(weight_array.sum()),
+        )
 
     def _compute_feedback_multiplier(self, pos_count: int, neg_count: int) -> float:
         """
@@ -146,72 +202,106 @@ class TagAnalyzer:
         if pos_count == 0 and neg_count == 0:
             return 1.0
 
-        # Use similar decay mechanism as feedback_learner
-        total_feedback = pos_count + neg_count
-        base_positive_delta = 0.1
-        base_negative_delta = 0.15
-        learning_rate_decay = 0.9
+        # Use similar decay mechanism as feedback_learner; the cumulative
+        # adjustment sum(decay ** (i + offset) for i in range(n)) is a
+        # geometric series, evaluated in closed form
+        decay = self.FEEDBACK_DECAY
+        pos_decay = decay**pos_count
+        neg_decay = decay**neg_count
+        pos_sum = neg_decay * (1.0 - pos_decay) / (1.0 - decay)
+        neg_sum = pos_decay * (1.0 - neg_decay) / (1.0 - decay)
+        multiplier = (
+            1.0
+            + self.FEEDBACK_POSITIVE_DELTA * pos_sum
+            - self.FEEDBACK_NEGATIVE_DELTA * neg_sum
+        )
 
-        # Calculate cumulative adjustment
-        multiplier = 1.0
-        for i in range(pos_count):
-            decay = learning_rate_decay ** (i + neg_count)
-            multiplier += base_positive_delta * decay
+        # Limit range [0.0, 2.0]
+        return max(0.0, min(2.0, multiplier))
 
-        for i in range(neg_count):
-            decay = learning_rate_decay ** (i + pos_count)
-            multiplier -= base_negative_delta * decay
+    @classmethod
+    def _compute_feedback_multipliers(
+        cls, pos_counts: np.ndarray, neg_counts: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized _compute_feedback_multiplier
 
-        # Limit range [0.0, 2.0]
-        multiplier = max(0.0, min(2.0, multiplier))
+        Args:
+            pos_counts: Positive feedback count per tag
+            neg_counts: Negative feedback count per tag
 
-        return multiplier
+        Returns:
+            Feedback multiplier per tag, limited to [0.0, 2.0]
+        """
+        decay = cls.FEEDBACK_DECAY
+        pos_decay = decay**pos_counts
+        neg_decay = decay**neg_counts
+        pos_sum = neg_decay * (1.0 - pos_decay) / (1.0 - decay)
+        neg_sum = pos_decay * (1.0 - neg_decay) / (1.0 - decay)
+        multipliers = (
+            1.0
+            + cls.FEEDBACK_POSITIVE_DELTA * pos_sum
+            - cls.FEEDBACK_NEGATIVE_DELTA * neg_sum
+        )
+        return np.clip(multipliers, 0.0, 2.0)
 
-    def _get_base_weights_for_sync(
+    def _compute_base_weight_array(
         self, favorite_galleries: List[Dict[str, Any]]
-    ) -> Dict[str, float]:
+    ) -> Tuple[List[str], np.ndarray]:
         """
-        Calculate pure base weights (for syncing to database, excluding feedback adjustments)
+        Calculate normalized base weights (TF * namespace weight) of all favorite tags
 
         Args:
             favorite_galleries: User favorite galleries list
 
         Returns:
-            Base weight dictionary (normalized)
+            (tags, base weight array aligned with tags)
         """
-        if not favorite_galleries:
-            return {}
-
         # Count tag frequency
-        tag_counter = Counter()
-        for gallery in favorite_galleries:
-            tags = gallery.get("tags", [])
-            if isinstance(tags, str):
-                try:
-                    tags = json.loads(tags)
-                except:
-                    tags = []
-            tag_counter.update(tags)
-
-        # Calculate base weights (TF * namespace weight)
-        base_weights = {}
-        for tag, count in tag_counter.items():
-            # Base frequency weight
-            tf = count / len(favorite_galleries)
-
-            # Namespace weight
-            namespace = tag.split(":", 1)[0] if ":" in tag else "other"
-            ns_weight = self.NAMESPACE_WEIGHTS.get(namespace, 1.0)
-
-            # Base weight (excluding feedback)
-            base_weights[tag] = tf * ns_weight
+        tag_counter = Counter(
+            chain.from_iterable(gallery["tags"] for gallery in favorite_galleries)
+        )
+
+        tags = list(tag_counter)
+        counts = np.fromiter(tag_counter.values(), dtype=np.float64, count=len(tags))
+
+        # Namespace weight looked up by namespace id; unknown namespaces map
+        # to the trailing 1.0 entry
+        default_id = len(self._NAMESPACE_IDS)
+        namespace_ids = np.fromiter(
+            (
+                self._NAMESPACE_IDS.get(
+                    tag.split(":", 1)[0] if ":" in tag else "other", default_id
+                )
+                for tag in tags
+            ),
+            dtype=np.intp,
+            count=len(tags),
+        )
+
+        base_array = (counts / len(favorite_galleries)) * self._NAMESPACE_WEIGHT_TABLE[
+            namespace_ids
+        ]
 
         # Normalize base weights
-        max_base_weight = max(base_weights.values()) if base_weights else 1.0
-        if max_base_weight > 0:
-            base_weights = {k: v / max_base_weight for k, v in base_weights.items()}
+        if base_array.size:
+            max_base_weight = base_array.max()
+            if max_base_weight > 0:
+                base_array /= max_base_weight
+
+        return tags, base_array
+
+    def _get_base_weights_for_sync(self) -> Dict[str, float]:
+        """
+        Get pure base weights (for syncing to database, excluding feedback adjustments)
 
-        return base_weights
+        The weights are the ones computed by the last
+        compute_tag_weights_from_favorites call, so favorites are not walked again
+
+        Returns:
+            Base weight dictionary (normalized)
+        """
+        return dict(self._feedback_state[0])
 
     def build_user_profile(
         self,
@@ -231,26 +321,75 @@ class TagAnalyzer:
         # Extract all tags
         all_tags_list = self.extract_tags_from_galleries(favorite_galleries)
 
-        # Convert to document format (space-separated)
-        tag_documents = [" ".join(tags) for tags in all_tags_list]
+        if not all_tags_list:
+            return
 
-        if not tag_documents:
+        # Tags are already atomic tokens, build the TF-IDF matrix from them
+        # directly instead of joining and re-tokenizing documents
+        n_docs = len(all_tags_list)
+        doc_freq = Counter(chain.from_iterable(set(tags) for tags in all_tags_list))
+        max_doc_count = self.TFIDF_MAX_DF * n_docs
+        vocab_tags = [tag for tag, df in doc_freq.items() if df <= max_doc_count]
+        if not vocab_tags:
+            self._tfidf_state = ({}, np.zeros(0, dtype=np.float32), None)
+            self.logger.error(
+                "Failed to build user profile: no tags remain after frequency pruning"
+            )
             return
 
-        # Use TF-IDF vectorization
-        self.vectorizer = TfidfVectorizer(
-            token_pattern=r"(?u)\b\w+:\w+\b|\b\w+\b",  # Match tag format
-            min_df=1,
-            max_df=0.8,
+        vocab = {tag: i for i, tag in enumerate(vocab_tags)}
+        df = np.fromiter(
+            (doc_freq[tag] for tag in vocab_tags),
+            dtype=np.float32,
+            count=len(vocab_tags),
         )
+        # Smoothed IDF: log((1 + n) / (1 + df)) + 1
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+
+        tag_matrix = self._transform_tags(all_tags_list, vocab, idf)
+        # User profile: average vector of all favorites, L2-normalized so cosine
+        # similarity is a plain dot product. Every vocabulary tag occurs in some
+        # favorite, so the mean has no zero entries and is kept dense: a CSR
+        # mat-vec against it is much faster than a sparse-sparse product
+        user_vector = np.asarray(tag_matrix.mean(axis=0), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(user_vector))
+        if norm > 0:
+            user_vector /= norm
+        # Vocabulary, IDF and profile vector are published together
+        self._tfidf_state = (vocab, idf, user_vector)
+        self.logger.info("User tag profile construction completed")
+
+    @staticmethod
+    def _transform_tags(
+        tags_list: List[List[str]], vocab: Dict[str, int], idf: np.ndarray
+    ) -> csr_matrix:
+        """
+        Build L2-normalized TF-IDF rows (float32 CSR) of tag lists
 
-        try:
-            tag_matrix = cast(csr_matrix, self.vectorizer.fit_transform(tag_documents))
-            # User profile: average vector of all favorites (converted to dense array)
-            self.user_vector = np.asarray(tag_matrix.mean(axis=0)).reshape(1, -1)
-            self.logger.info("User tag profile construction completed")
-        except Exception as e:
-            self.logger.error(f"Failed to build user profile: {e}")
+        Args:
+            tags_list: Tag list of each gallery; tags outside the vocabulary are ignored
+            vocab: TF-IDF vocabulary (tag -> column)
+            idf: IDF per column
+
+        Returns:
+            Matrix of shape (len(tags_list), vocabulary size)
+        """
+        row_ids = [[vocab[tag] for tag in tags if tag in vocab] for tags in tags_list]
+
+        indptr = np.zeros(len(row_ids) + 1, dtype=np.int32)
+        np.cumsum([len(ids) for ids in row_ids], out=indptr[1:])
+        indices = np.fromiter(
+            chain.from_iterable(row_ids), dtype=np.int32, count=int(indptr[-1])
+        )
+        matrix = csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr),
+            shape=(len(row_ids), len(vocab)),
+        )
+        # Repeated tags add up as term frequency
+        matrix.sum_duplicates()
+        matrix.data *= idf[matrix.indices]
+
+        return cast(csr_matrix, normalize(matrix, norm="l2", copy=False))
 
     def compute_tag_similarity(self, candidate_tags: List[str]) -> float:
         """
@@ -262,43 +401,93 @@ class TagAnalyzer:
         Returns:
             Similarity score (0-1)
         """
-        if not self.user_tag_weights or not candidate_tags:
-            return 0.0
-
-        # Method 1: Weighted Jaccard similarity
-        candidate_set = set(candidate_tags)
-        user_tags = set(self.user_tag_weights.keys())
+        return float(self.compute_tag_similarities([candidate_tags])[0])
 
-        intersection = candidate_set & user_tags
-        if not intersection:
-            return 0.0
+    def compute_tag_similarities(
+        self, candidate_tags_list: List[List[str]]
+    ) -> np.ndarray:
+        """
+        Compute tag similarity of many candidate galleries at once
 
-        total_user_weight = sum(self.user_tag_weights.values())
-        if total_user_weight <= 0:
-            return 0.0
+        Args:
+            candidate_tags_list: Tag list of each candidate gallery
 
-        weighted_intersection = sum(self.user_tag_weights[tag] for tag in intersection)
+        Returns:
+            Similarity scores (0-1), one per gallery
+        """
+        # Galleries sharing a tag set score the same, compute each set once
+        unique_index: Dict[frozenset, int] = {}
+        unique_tags_list: List[List[str]] = []
+        inverse = np.empty(len(candidate_tags_list), dtype=np.intp)
+        for i, candidate_tags in enumerate(candidate_tags_list):
+            key = frozenset(candidate_tags)
+            position = unique_index.get(key)
+            if position is None:
+                position = unique_index[key] = len(unique_tags_list)
+                unique_tags_list.append(candidate_tags)
+            inverse[i] = position
 
-        # Use normalized weight ratio as similarity
-        jaccard_score = min(1.0, weighted_intersection / total_user_weight)
+        # Method 1: Weighted Jaccard similarity
+        # (on the deduplication tag sets, no further set is built per candidate)
+        scores, matched = self._compute_weighted_jaccards(list(unique_index))
 
-        # Method 2: Use TF-IDF vector cosine similarity (if built)
-        if self.vectorizer is not None and self.user_vector is not None:
+        # Method 2: Use TF-IDF vector cosine similarity (if built), one
+        # transform over all matched candidates
+        vocab, idf, user_vector = self._tfidf_state
+        if matched.size and user_vector is not None:
             try:
-                candidate_doc = " ".join(candidate_tags)
-                candidate_vector_sparse = cast(
-                    csr_matrix, self.vectorizer.transform([candidate_doc])
+                candidate_matrix = self._transform_tags(
+                    [unique_tags_list[i] for i in matched], vocab, idf
                 )
-                candidate_vector = candidate_vector_sparse.toarray()
-                user_vector = self.user_vector
-                cosine_score = cosine_similarity(user_vector, candidate_vector)[0][0]
+                # Both the candidate rows and the user vector are L2-normalized
+                cosine_scores = candidate_matrix @ user_vector
 
                 # Combine both methods
-                return 0.6 * jaccard_score + 0.4 * cosine_score
-            except:
-                return jaccard_score
+                scores[matched] = 0.6 * scores[matched] + 0.4 * cosine_scores
+            except Exception:
+                pass
+
+        return scores[inverse]
+
+    def _compute_weighted_jaccards(
+        self, candidate_tag_sets: List[frozenset]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Weighted Jaccard similarity of many candidates
+
+        Args:
+            candidate_tag_sets: Distinct tags of each candidate gallery
+
+        Returns:
+            (similarity scores, indices of candidates with a tag in the profile);
+            candidates without a matching tag score 0
+        """
+        count = len(candidate_tag_sets)
+        user_tag_weights, tag_index, weight_array, total_user_weight = (
+            self._weight_state
+        )
+        if not user_tag_weights or total_user_weight <= 0:
+            return np.zeros(count), np.zeros(0, dtype=np.intp)
+
+        # Profile tag ids of all candidates flattened, with the owning candidate
+        tag_ids: List[int] = []
+        owners: List[int] = []
+        for i, candidate_tags in enumerate(candidate_tag_sets):
+            ids = [tag_index[tag] for tag in candidate_tags if tag in tag_index]
+            tag_ids.extend(ids)
+            owners.extend([i] * len(ids))
+
+        owner_array = np.asarray(owners, dtype=np.intp)
+        weighted_intersection = np.bincount(
+            owner_array,
+            weights=weight_array[np.asarray(tag_ids, dtype=np.intp)],
+            minlength=count,
+        )
+        matched = np.flatnonzero(np.bincount(owner_array, minlength=count))
 
-        return jaccard_score
+        # Use normalized weight ratio as similarity
+        scores = np.minimum(1.0, weighted_intersection / total_user_weight)
+        return scores, matched
 
     def get_top_tags(self, n: int = 20) -> List[tuple]:
         """
@@ -310,10 +499,7 @@ class TagAnalyzer:
         Returns:
             [(tag, weight), ...] list
         """
-        sorted_tags = sorted(
-            self.user_tag_weights.items(), key=lambda x: x[1], reverse=True
-        )
-        return sorted_tags[:n]
+        return heapq.nlargest(n, self.user_tag_weights.items(), key=lambda x: x[1])
 
     def explain_similarity(
         self, candidate_tags: List[str], top_n: int = 5
@@ -328,16 +514,13 @@ class TagAnalyzer:
         Returns:
             Matched tag list
         """
-        candidate_set = set(candidate_tags)
-        user_tags = set(self.user_tag_weights.keys())
+        _, tag_index, weight_array, _ = self._weight_state
+        matched_tags = [tag for tag in set(candidate_tags) if tag in tag_index]
+        if not matched_tags:
+            return []
 
-        matched_tags = candidate_set & user_tags
-
-        # Sort by weight
-        sorted_matches = sorted(
-            [(tag, self.user_tag_weights[tag]) for tag in matched_tags],
-            key=lambda x: x[1],
-            reverse=True,
-        )
+        # Sort by weight (gathered from the weight array)
+        weights = weight_array[[tag_index[tag] for tag in matched_tags]]
+        order = np.argsort(-weights, kind="stable")[:top_n]
 
-        return [tag for tag, _ in sorted_matches[:top_n]]
+        return [matched_tags[i] for i in order]
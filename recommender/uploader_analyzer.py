@@ -1,8 +1,10 @@
 """Uploader analyzer"""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from collections import Counter
+import heapq
 import logging
+import numpy as np
 
 
 class UploaderAnalyzer:
@@ -11,8 +13,19 @@ class UploaderAnalyzer:
     def __init__(self):
         """Initialize uploader analyzer"""
         self.logger = logging.getLogger(__name__)
-        self.uploader_weights: Dict[str, float] = {}
-        self.uploader_gallery_count: Dict[str, int] = {}
+        # (uploader weights, gallery count per uploader), published as one
+        # tuple: profiles are rebuilt in worker threads while others read them
+        self._profile: Tuple[Dict[str, float], Dict[str, int]] = ({}, {})
+
+    @property
+    def uploader_weights(self) -> Dict[str, float]:
+        """Current uploader weights of the user profile"""
+        return self._profile[0]
+
+    @property
+    def uploader_gallery_count(self) -> Dict[str, int]:
+        """Favorite gallery count per uploader"""
+        return self._profile[1]
 
     def build_uploader_profile(self, favorite_galleries: List[Dict[str, Any]]) -> None:
         """
@@ -34,29 +47,29 @@ class UploaderAnalyzer:
             return
 
         # Calculate weights (frequency + normalization)
-        for uploader, count in uploader_counter.items():
-            # Frequency weight
-            frequency_weight = count / total_favorites
-
-            # Enhance weights for high-frequency uploaders
-            if count >= 5:
-                frequency_weight *= 1.5
-            elif count >= 3:
-                frequency_weight *= 1.2
+        uploaders = list(uploader_counter)
+        counts = np.fromiter(
+            uploader_counter.values(), dtype=np.int64, count=len(uploaders)
+        )
 
-            self.uploader_weights[uploader] = frequency_weight
-            self.uploader_gallery_count[uploader] = count
+        # Frequency weight, enhanced for high-frequency uploaders
+        frequency_weights = (counts / total_favorites) * np.where(
+            counts >= 5, 1.5, np.where(counts >= 3, 1.2, 1.0)
+        )
 
         # Normalize
-        max_weight = (
-            max(self.uploader_weights.values()) if self.uploader_weights else 1.0
+        if uploaders:
+            frequency_weights /= frequency_weights.max()
+
+        # New dicts replace the previous profile (uploaders no longer in the
+        # favorites are dropped)
+        self._profile = (
+            dict(zip(uploaders, frequency_weights.tolist())),
+            dict(zip(uploaders, counts.tolist())),
         )
-        self.uploader_weights = {
-            k: v / max_weight for k, v in self.uploader_weights.items()
-        }
 
         self.logger.info(
-            f"Uploader profile construction completed, {len(self.uploader_weights)} uploaders"
+            f"Uploader profile construction completed, {len(uploaders)} uploaders"
         )
 
     def compute_uploader_score(self, candidate_uploader: str) -> float:
@@ -69,15 +82,32 @@ class UploaderAnalyzer:
         Returns:
             Score (0-1)
         """
-        if not candidate_uploader or not self.uploader_weights:
-            return 0.0
+        return float(self.compute_uploader_scores([candidate_uploader])[0])
+
+    def compute_uploader_scores(self, candidate_uploaders: List[str]) -> np.ndarray:
+        """
+        Compute uploader matching scores of many candidates against one profile
 
-        # Direct match
-        if candidate_uploader in self.uploader_weights:
-            return self.uploader_weights[candidate_uploader]
+        Args:
+            candidate_uploaders: Uploader of each candidate gallery
 
-        # Unknown uploader, return low score (but not 0, give new uploaders a chance)
-        return 0.1
+        Returns:
+            Scores (0-1), one per gallery
+        """
+        uploader_weights = self._profile[0]
+        if not uploader_weights:
+            return np.zeros(len(candidate_uploaders))
+
+        # Direct match; unknown uploader gets a low score (but not 0, give
+        # new uploaders a chance), no uploader scores 0
+        return np.fromiter(
+            (
+                uploader_weights.get(uploader, 0.1) if uploader else 0.0
+                for uploader in candidate_uploaders
+            ),
+            dtype=float,
+            count=len(candidate_uploaders),
+        )
 
     def get_top_uploaders(self, n: int = 10) -> List[tuple]:
         """
@@ -89,13 +119,13 @@ class UploaderAnalyzer:
         Returns:
             [(uploader, weight, count), ...] list
         """
-        sorted_uploaders = sorted(
-            self.uploader_weights.items(), key=lambda x: x[1], reverse=True
-        )
+        uploader_weights, gallery_count = self._profile
+        top_uploaders = heapq.nlargest(n, uploader_weights.items(), key=lambda x: x[1])
 
+        # Uploaders added by feedback have no favorites
         return [
-            (uploader, weight, self.uploader_gallery_count[uploader])
-            for uploader, weight in sorted_uploaders[:n]
+            (uploader, weight, gallery_count.get(uploader, 0))
+            for uploader, weight in top_uploaders
         ]
 
     def update_uploader_preference(self, uploader: str, is_positive: bool) -> None:
@@ -109,7 +139,8 @@ class UploaderAnalyzer:
         if not uploader:
             return
 
-        current_weight = self.uploader_weights.get(uploader, 0.1)
+        uploader_weights, gallery_count = self._profile
+        current_weight = uploader_weights.get(uploader, 0.1)
 
         if is_positive:
             # Positive feedback: increase weight
@@ -118,5 +149,6 @@ class UploaderAnalyzer:
             # Negative feedback: decrease weight
             new_weight = max(0.0, current_weight - 0.2)
 
-        self.uploader_weights[uploader] = new_weight
+        # Copy on write, the published dict may be in use by a reader
+        self._profile = ({**uploader_weights, uploader: new_weight}, gallery_count)
         self.logger.debug(f"Updated uploader weight: {uploader} -> {new_weight:.2f}")
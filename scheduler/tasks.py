@@ -1,8 +1,9 @@
 """Scheduled tasks module"""
 
+import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -23,6 +24,7 @@ class TaskScheduler:
         crawler_config: Dict[str, Any],
         telegram_config: Dict[str, Any],
         scheduler_config: Dict[str, Any],
+        favorites_crawler: Optional[FavoritesCrawler] = None,
     ):
         """
         Initialize scheduler
@@ -35,6 +37,7 @@ class TaskScheduler:
             crawler_config: Crawler configuration
             telegram_config: Telegram configuration
             scheduler_config: Scheduler configuration
+            favorites_crawler: Shared favorites crawler (optional)
         """
         self.database = database
         self.ehdb_database = ehdb_database
@@ -49,11 +52,14 @@ class TaskScheduler:
 
         # Notifier
         self.notifier = TelegramNotifier(
-            bot, telegram_config["chat_id"], crawler_config.get("host", "e-hentai.org")
+            bot,
+            telegram_config["chat_id"],
+            crawler_config.get("host", "e-hentai.org"),
+            database,
         )
 
-        # Favorites crawler
-        self.favorites_crawler = FavoritesCrawler(crawler_config)
+        # Favorites crawler (reuse shared instance to keep HTTP connections warm)
+        self.favorites_crawler = favorites_crawler or FavoritesCrawler(crawler_config)
 
     async def task_sync_favorites(self):
         """Scheduled favorites sync task"""
@@ -61,18 +67,19 @@ class TaskScheduler:
 
         try:
             # Get known favorites
-            known_gids = {gid for gid, _ in self.database.get_all_favorites()}
+            known_gids = await asyncio.to_thread(self.database.get_all_favorite_gids)
 
             # Incremental crawl
-            new_favorites = self.favorites_crawler.fetch_new_favorites(known_gids)
+            new_favorites = await asyncio.to_thread(
+                self.favorites_crawler.fetch_new_favorites, known_gids
+            )
 
             # Save to database
-            for gid, token, added_time in new_favorites:
-                self.database.add_favorite(gid, token, added_time)
+            await asyncio.to_thread(self.database.add_favorites_bulk, new_favorites)
 
             # Re-initialize recommendation engine
             if new_favorites:
-                self.recommender.initialize()
+                await asyncio.to_thread(self.recommender.initialize)
                 self.logger.info(
                     f"Favorites sync completed, {len(new_favorites)} new items"
                 )
@@ -87,25 +94,27 @@ class TaskScheduler:
         self.logger.info("Starting new gallery check")
 
         try:
+            # Check window ends now; stored as next checkpoint so galleries
+            # posted during this check are picked up next time
+            now_ts = int(time.time())
+
             # Get last checkpoint
             last_check = self.database.get_checkpoint("new_gallery_check")
             if last_check:
                 since_timestamp = int(last_check)
             else:
                 # Default: check last 1 hour
-                since_timestamp = int(datetime.now().timestamp()) - 3600
+                since_timestamp = now_ts - 3600
 
-            # Recommend new galleries
-            recommendations = self.recommender.recommend_new_galleries(
-                since_timestamp, limit=200
+            # Recommend new galleries (in a worker thread, scoring is CPU-bound)
+            recommendations = await asyncio.to_thread(
+                self.recommender.recommend_new_galleries, since_timestamp, limit=200
             )
 
             if not recommendations:
                 self.logger.info("No matching new galleries")
                 # Update checkpoint
-                self.database.set_checkpoint(
-                    "new_gallery_check", str(int(datetime.now().timestamp()))
-                )
+                self.database.set_checkpoint("new_gallery_check", str(now_ts))
                 return
 
             # Check notification mode
@@ -113,16 +122,9 @@ class TaskScheduler:
                 "notification_mode", "immediate"
             )
 
-            immediate_recs = []
-            batch_recs = []
-
-            for rec in recommendations:
-                score = rec["score"]
-
-                if self.recommender.should_push_immediately(score):
-                    immediate_recs.append(rec)
-                else:
-                    batch_recs.append(rec)
+            immediate_recs, batch_recs = self.recommender.split_by_push_threshold(
+                recommendations
+            )
 
             # Immediately push high-score recommendations
             if notification_mode != "manual" and immediate_recs:
@@ -130,20 +132,17 @@ class TaskScheduler:
                     f"Found {len(immediate_recs)} high-score new galleries, pushing immediately"
                 )
 
-                for rec in immediate_recs:
-                    gallery = rec["gallery"]
-                    score = rec["score"]
-                    details = rec["details"]
-
-                    # Save recommendation record
-                    self.database.add_recommendation(
-                        gallery["gid"], score, details, notified=True
-                    )
+                # Save recommendation records
+                await asyncio.to_thread(
+                    self.database.add_recommendations_bulk,
+                    [
+                        (rec["gallery"]["gid"], rec["score"], rec["details"], True)
+                        for rec in immediate_recs
+                    ],
+                )
 
-                    # Send
-                    await self.notifier.send_recommendation(
-                        gallery, score, details, source="new"
-                    )
+                # Send (concurrently, bounded by the notifier's send workers)
+                await self.notifier.send_recommendations(immediate_recs, source="new")
 
             # Save batch recommendations to database, wait for batch notification task
             if batch_recs:
@@ -151,19 +150,16 @@ class TaskScheduler:
                     f"Saving {len(batch_recs)} regular new galleries, waiting for batch notification"
                 )
 
-                for rec in batch_recs:
-                    gallery = rec["gallery"]
-                    score = rec["score"]
-                    details = rec["details"]
-
-                    self.database.add_recommendation(
-                        gallery["gid"], score, details, notified=False
-                    )
+                await asyncio.to_thread(
+                    self.database.add_recommendations_bulk,
+                    [
+                        (rec["gallery"]["gid"], rec["score"], rec["details"], False)
+                        for rec in batch_recs
+                    ],
+                )
 
             # Update checkpoint
-            self.database.set_checkpoint(
-                "new_gallery_check", str(int(datetime.now().timestamp()))
-            )
+            self.database.set_checkpoint("new_gallery_check", str(now_ts))
 
             self.logger.info("New gallery check completed")
 
@@ -17,6 +17,8 @@ class Config:
         """
         self.config_path = Path(config_path)
         self._config: Dict[str, Any] = {}
+        # Every (nested) item by its dot-separated key, built at load time
+        self._flat: Dict[str, Any] = {}
         self.load()
 
     def load(self) -> None:
@@ -30,6 +32,27 @@ class Config:
         with open(self.config_path, "r", encoding="utf-8") as f:
             self._config = yaml.safe_load(f)
 
+        self._flat = {}
+        self._flatten(self._config, "")
+
+    def _flatten(self, node: Any, prefix: str) -> None:
+        """
+        Index all items under node by dot-separated key
+
+        Args:
+            node: Configuration node
+            prefix: Dot-separated key of node ('' for the root)
+        """
+        if not isinstance(node, dict):
+            return
+
+        for k, value in node.items():
+            if not isinstance(k, str):
+                continue
+            key = f"{prefix}.{k}" if prefix else k
+            self._flat[key] = value
+            self._flatten(value, key)
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get configuration item (supports dot-separated nested keys)
@@ -41,16 +64,7 @@ class Config:
         Returns:
             Configuration value
         """
-        keys = key.split(".")
-        value = self._config
-
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-
-        return value
+        return self._flat.get(key, default)
 
     @property
     def ehdb_database(self) -> Dict[str, Any]:
@@ -2,8 +2,138 @@
 
 import json
 import logging
+import sys
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, FrozenSet, NamedTuple, Optional, Tuple, cast
+
+try:
+    # Optional: faster JSON decoder, stdlib json is used when unavailable
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+_LOCALE_DIR = Path(__file__).resolve().parent.parent / "locales"
+
+
+class _TranslationFile(NamedTuple):
+    """Parsed translation file (shared, must not be modified)"""
+
+    mtime: float
+    translations: Dict[str, Any]
+    # Dot-separated key -> entry, intermediate nodes included
+    flat: Dict[str, Any]
+    # Keys of string entries without placeholders (returned as is by t())
+    plain: FrozenSet[str]
+    # Bound str.format_map of the string entries with placeholders
+    formatters: Dict[str, Callable[[Dict[str, Any]], str]]
+
+
+# Parsed translation files shared by all I18n instances, by file path;
+# reloaded when the file mtime changes
+_translation_cache: Dict[Path, _TranslationFile] = {}
+# get_available_locales result with the (file name, mtime) list it was built from
+_available_locales_cache: Optional[
+    Tuple[Tuple[Tuple[str, float], ...], Dict[str, str]]
+] = None
+# Telegram language codes that differ from our locale codes
+_LANG_MAP = {
+    "zh": "zh_CN",
+    "zh-CN": "zh_CN",
+    "zh-TW": "zh_TW",
+    "zh-HK": "zh_TW",
+}
+
+# Locale code -> translation file, rebuilt when the locales directory changes
+_locale_files: Dict[str, Path] = {}
+_locale_dir_mtime: Optional[float] = None
+_cache_lock = threading.Lock()
+
+
+def _get_locale_files() -> Dict[str, Path]:
+    """
+    Get translation files of the locales directory without globbing on every call
+
+    Returns:
+        {locale code: translation file path}, empty if the directory is missing
+    """
+    global _locale_files, _locale_dir_mtime
+
+    try:
+        mtime = _LOCALE_DIR.stat().st_mtime
+    except OSError:
+        return {}
+
+    # Directory mtime changes when a file is added, removed or renamed
+    if mtime != _locale_dir_mtime:
+        files = {p.stem: p for p in sorted(_LOCALE_DIR.glob("*.json"))}
+        with _cache_lock:
+            _locale_files, _locale_dir_mtime = files, mtime
+        return files
+    return _locale_files
+
+
+def _flatten_translations(
+    node: Dict[str, Any], prefix: str = "", flat: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Index all (nested) translation entries by dot-separated key
+
+    Args:
+        node: Translation node
+        prefix: Dot-separated key of node ('' for the root)
+        flat: Index to fill (a new one if not given)
+
+    Returns:
+        {'commands.start.title': value, ...}, intermediate nodes included
+    """
+    if flat is None:
+        flat = {}
+    for k, value in node.items():
+        key = sys.intern(f"{prefix}.{k}" if prefix else k)
+        flat[key] = value
+        if isinstance(value, dict):
+            _flatten_translations(value, key, flat)
+    return flat
+
+
+def _read_translations(locale_file: Path) -> _TranslationFile:
+    """
+    Read a translation file, reusing the parsed content while it is unchanged
+
+    Args:
+        locale_file: Translation file path
+
+    Returns:
+        Parsed translation file
+    """
+    mtime = locale_file.stat().st_mtime
+    cached = _translation_cache.get(locale_file)
+    if cached is not None and cached.mtime == mtime:
+        return cached
+
+    # Both decoders take UTF-8 bytes. Unbuffered: FileIO.readall sizes the
+    # read from fstat and fills one bytes object
+    with open(locale_file, "rb", buffering=0) as f:
+        translations = _json_loads(f.read())
+    flat = _flatten_translations(translations)
+    plain = frozenset(
+        key
+        for key, value in flat.items()
+        if isinstance(value, str) and "{" not in value
+    )
+    formatters = {
+        key: value.format_map
+        for key, value in flat.items()
+        if isinstance(value, str) and "{" in value
+    }
+
+    loaded = _TranslationFile(mtime, translations, flat, plain, formatters)
+    with _cache_lock:
+        _translation_cache[locale_file] = loaded
+    return loaded
 
 
 class I18n:
@@ -17,31 +147,46 @@ class I18n:
             locale: Language code (e.g., 'en', 'zh_CN')
         """
         self.locale = locale
-        self.translations: Dict[str, Any] = {}
         self.logger = logging.getLogger(__name__)
-        self._load_translations()
+        # Loaded on first use, along with the dot-separated key index
+        self._translations: Optional[Dict[str, Any]] = None
+        self._flat: Dict[str, Any] = {}
+        self._plain: FrozenSet[str] = frozenset()
+        self._formatters: Dict[str, Callable[[Dict[str, Any]], str]] = {}
+
+    @property
+    def translations(self) -> Dict[str, Any]:
+        """Translations of the current locale (loaded on first access)"""
+        if self._translations is None:
+            self._load_translations()
+        return cast(Dict[str, Any], self._translations)
 
     def _load_translations(self) -> None:
         """Load translation files"""
-        locale_dir = Path(__file__).parent.parent / "locales"
-        locale_file = locale_dir / f"{self.locale}.json"
+        locale_files = _get_locale_files()
+        locale_file = locale_files.get(self.locale)
 
-        if not locale_file.exists():
+        if locale_file is None:
             self.logger.warning(
-                f"Translation file not found: {locale_file}, using English"
+                f"Translation file not found: {_LOCALE_DIR / f'{self.locale}.json'}, using English"
             )
-            locale_file = locale_dir / "en.json"
+            locale_file = locale_files.get("en")
 
-        if locale_file.exists():
+        if locale_file is not None:
             try:
-                with open(locale_file, "r", encoding="utf-8") as f:
-                    self.translations = json.load(f)
+                loaded = _read_translations(locale_file)
+                self._translations = loaded.translations
+                self._flat = loaded.flat
+                self._plain = loaded.plain
+                self._formatters = loaded.formatters
+                return
             except Exception as e:
                 self.logger.error(f"Failed to load translations: {e}")
-                self.translations = {}
         else:
             self.logger.warning("No translation files found, using empty translations")
-            self.translations = {}
+
+        self._translations, self._flat = {}, {}
+        self._plain, self._formatters = frozenset(), {}
 
     def t(self, key: str, **kwargs) -> str:
         """
@@ -54,37 +199,61 @@ class I18n:
         Returns:
             Translated string
         """
-        keys = key.split(".")
-        value = self.translations
+        if self._translations is None:
+            self._load_translations()
 
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                # Fallback to key if translation not found
-                self.logger.warning(f"Translation key not found: {key}")
-                return key
+        # Templates without placeholders need no formatting
+        if key in self._plain:
+            return self._flat[key]
 
-        if not isinstance(value, str):
-            self.logger.warning(f"Translation value is not a string: {key}")
-            return key
+        formatter = self._formatters.get(key)
+        if formatter is None:
+            # Missing key or non-string entry, get_raw warns and falls back
+            return self.get_raw(key)
+        if not kwargs:
+            return self._flat[key]
 
-        # Format with kwargs if provided
         try:
-            return value.format(**kwargs) if kwargs else value
+            # kwargs is already a dict, format_map avoids re-packing it
+            return formatter(kwargs)
         except KeyError as e:
             self.logger.warning(f"Missing format variable {e} in translation: {key}")
-            return value
+            return self._flat[key]
+
+    def get_raw(self, key: str) -> str:
+        """
+        Get raw (unformatted) translation template
+
+        Args:
+            key: Translation key (supports dot notation, e.g., 'commands.start')
+
+        Returns:
+            Translation template, or the key itself if not found
+        """
+        if self._translations is None:
+            self._load_translations()
+
+        value = self._flat.get(key)
+        if value is None:
+            # Fallback to key if translation not found
+            self.logger.warning(f"Translation key not found: {key}")
+            return key
+
+        if not isinstance(value, str):
+            self.logger.warning(f"Translation value is not a string: {key}")
+            return key
+
+        return value
 
     def set_locale(self, locale: str) -> None:
         """
-        Change locale and reload translations
+        Change locale (translations are reloaded on next use)
 
         Args:
             locale: Language code
         """
         self.locale = locale
-        self._load_translations()
+        self._translations = None
 
     @staticmethod
     def get_user_locale(update) -> str:
@@ -97,24 +266,20 @@ class I18n:
         Returns:
             Language code
         """
-        if update.message and update.message.from_user:
-            lang_code = update.message.from_user.language_code
-            if lang_code:
-                # Map common language codes
-                lang_map = {
-                    "zh": "zh_CN",
-                    "zh-CN": "zh_CN",
-                    "zh-TW": "zh_TW",
-                    "zh-HK": "zh_TW",
-                }
-                mapped = lang_map.get(lang_code)
-                if mapped:
-                    return mapped
-                # Fallback to first part of language code
-                parts = lang_code.split("-")
-                if parts and parts[0]:
-                    return parts[0]
-        return "en"
+        message = update.message
+        user = message.from_user if message else None
+        lang_code = user.language_code if user else None
+        if not lang_code:
+            return "en"
+
+        # Map common language codes
+        mapped = _LANG_MAP.get(lang_code)
+        if mapped:
+            return mapped
+
+        # Fallback to first part of language code (mapped as well)
+        prefix = lang_code.partition("-")[0]
+        return _LANG_MAP.get(prefix, prefix or "en")
 
     @staticmethod
     def get_available_locales() -> Dict[str, str]:
@@ -125,25 +290,35 @@ class I18n:
             Dictionary mapping locale codes to their display names
             e.g., {"en": "English", "zh_CN": "简体中文"}
         """
-        locale_dir = Path(__file__).parent.parent / "locales"
+        global _available_locales_cache
+
         available_languages = {}
 
-        if not locale_dir.exists():
+        locale_files = list(_get_locale_files().values())
+        if not locale_files:
             return {"en": "English"}  # Fallback
 
+        # Reuse the previous scan while no locale file was added, removed or changed
+        try:
+            snapshot = tuple((p.name, p.stat().st_mtime) for p in locale_files)
+        except OSError:
+            snapshot = None
+        cached = _available_locales_cache
+        if snapshot is not None and cached is not None and cached[0] == snapshot:
+            return dict(cached[1])
+
         # Scan for all .json files in locales directory
-        for locale_file in locale_dir.glob("*.json"):
+        for locale_file in locale_files:
             locale_code = locale_file.stem  # Get filename without extension
 
             # Load the language file to get the display name
             try:
-                with open(locale_file, "r", encoding="utf-8") as f:
-                    translations = json.load(f)
-                    # Get language name from translations
-                    lang_name = translations.get("languages", {}).get(
-                        locale_code, locale_code
-                    )
-                    available_languages[locale_code] = lang_name
+                translations = _read_translations(locale_file).translations
+                # Get language name from translations
+                lang_name = translations.get("languages", {}).get(
+                    locale_code, locale_code
+                )
+                available_languages[locale_code] = lang_name
             except Exception:
                 # If we can't load it, just use the code as name
                 available_languages[locale_code] = locale_code
@@ -152,4 +327,8 @@ class I18n:
         if "en" not in available_languages:
             available_languages["en"] = "English"
 
+        if snapshot is not None:
+            with _cache_lock:
+                _available_locales_cache = (snapshot, dict(available_languages))
+
         return available_languages
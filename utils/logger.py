@@ -1,9 +1,59 @@
 """Logging configuration module"""
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+# Formatter shared by all handlers (formatting keeps no per-record state)
+_FORMATTER = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """File handler that writes through a large buffer instead of flushing every record"""
+
+    BUFFER_SIZE = 64 * 1024
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        # Warnings and errors are written out right away
+        if record.levelno >= logging.WARNING:
+            self.flush_buffer()
+
+    def flush(self) -> None:
+        # StreamHandler.emit flushes after each record, buffer is flushed by
+        # flush_buffer() instead (the stream is flushed on close as well)
+        pass
+
+    def flush_buffer(self) -> None:
+        """Write buffered records to the file"""
+        super().flush()
+
+
+class _BatchFlushQueueListener(logging.handlers.QueueListener):
+    """Queue listener flushing buffered file handlers once the queue is drained"""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                if isinstance(handler, _BufferedFileHandler):
+                    handler.flush_buffer()
 
 
 def setup_logger(
@@ -12,6 +62,9 @@ def setup_logger(
     """
     Setup logger
 
+    Records are handed to a background thread through a queue, which formats
+    and writes them, so logging calls do not block on console or file I/O.
+
     Args:
         name: Logger name
         level: Log level (DEBUG/INFO/WARNING/ERROR/CRITICAL)
@@ -27,24 +80,30 @@ def setup_logger(
     if logger.handlers:
         return logger
 
-    # Formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(_FORMATTER)
+    handlers: List[logging.Handler] = [console_handler]
 
     # File handler (if specified)
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler = _BufferedFileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(_FORMATTER)
+        handlers.append(file_handler)
+
+    # Queue between the logger and the actual handlers; the file is flushed
+    # once per burst of records. The listener thread is stopped (and the
+    # queue drained) at interpreter exit
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = _BatchFlushQueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger